@@ -0,0 +1,52 @@
+"""
+benchmark for the CDP graph builder using synthetic CDP entries (as returned by the TextFSM template)
+
+The time per entry should stay constant if the number of neighbor entries grows (linear scaling).
+"""
+import time
+from cdp_graph import CdpGraphBuilder
+
+DEVICE_COUNT = 500
+ENTRY_COUNTS = [6250, 12500, 25000, 50000]
+
+
+def create_synthetic_entries(entry_count, device_count=DEVICE_COUNT):
+    """
+    create synthetic CDP entries, every device has multiple links to other devices
+
+    :param entry_count: number of CDP neighbor entries
+    :param device_count: number of devices that provide CDP information
+    :return: list of parsed entries
+    """
+    entries = []
+    for i in range(entry_count):
+        local_host = "switch-%d" % (i % device_count)
+        remote_host = "switch-%d" % ((i * 7 + 1) % (entry_count // 4 or 1))
+        entries.append([
+            local_host,
+            remote_host,
+            "10.%d.%d.%d" % ((i // 65536) % 256, (i // 256) % 256, i % 256),
+            "cisco WS-C3750X-24",
+            "GigabitEthernet1/0/%d" % (i % 48 + 1),
+            "GigabitEthernet2/0/%d" % (i % 48 + 1),
+            "Cisco IOS Software, C3750E Software (C3750E-UNIVERSALK9-M), Version 15.0(2)SE5"
+        ])
+    return entries
+
+
+if __name__ == "__main__":
+    print("%10s %10s %10s %12s %16s" % ("entries", "nodes", "edges", "time (ms)", "time/entry (us)"))
+    for entry_count in ENTRY_COUNTS:
+        fsm_results = create_synthetic_entries(entry_count)
+
+        start = time.perf_counter()
+        graph_builder = CdpGraphBuilder()
+        graph_builder.add_entries(fsm_results)
+        data = graph_builder.get_data()
+        duration = time.perf_counter() - start
+
+        print("%10d %10d %10d %12.1f %16.2f" % (entry_count,
+                                               len(data["nodes"]),
+                                               len(data["edges"]),
+                                               duration * 1000,
+                                               duration * 1000000 / entry_count))
@@ -0,0 +1,243 @@
+"""
+helper functions to collect the CDP neighbor details from one or many Cisco devices using SSH
+
+The collection from multiple devices is executed within a thread pool, because most of the time is spent waiting on
+the SSH sessions. The total runtime therefore depends on the slowest device and not on the sum of all devices.
+"""
+import concurrent.futures
+import os
+import re
+import sys
+import time
+from netmiko import ConnectHandler
+from netmiko import NetMikoAuthenticationException
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.textfsm_templates import get_template
+from cdp_graph import normalize_hostname
+
+CDP_TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "show_cdp_neighbor_detail.textfsm")
+
+
+def get_cdp_neighbor_details(ip, username, password, enable_secret, timeout=None):
+    """
+    get the CDP neighbor detail from the device using SSH
+
+    :param ip: IP address of the device
+    :param username: username used for the authentication
+    :param password: password used for the authentication
+    :param enable_secret: enable secret
+    :param timeout: SSH connection timeout in seconds, the netmiko default is used if not set
+    :return:
+    """
+    connection_parameters = {
+        "device_type": "cisco_ios",
+        "ip": ip,
+        "username": username,
+        "password": password,
+        "secret": enable_secret
+    }
+    if timeout:
+        connection_parameters["timeout"] = timeout
+
+    # establish a connection to the device
+    ssh_connection = ConnectHandler(**connection_parameters)
+
+    try:
+        # enter enable mode
+        ssh_connection.enable()
+
+        # prepend the command prompt to the result (used to identify the local device)
+        result = ssh_connection.find_prompt() + "\n"
+
+        # execute the show cdp neighbor detail command
+        # we increase the delay_factor for this command, because it take some time if many devices are seen by CDP
+        result += ssh_connection.send_command("show cdp neighbor detail", delay_factor=2)
+
+    finally:
+        # close SSH connection
+        ssh_connection.disconnect()
+
+    return result
+
+
+def get_cdp_neighbor_details_with_retry(ip, username, password, enable_secret, timeout=None, retries=0,
+                                       retry_delay=2):
+    """
+    get the CDP neighbor detail from the device, failed attempts are repeated up to the given number of retries
+    (authentication failures are not repeated)
+
+    :param ip: IP address of the device
+    :param username: username used for the authentication
+    :param password: password used for the authentication
+    :param enable_secret: enable secret
+    :param timeout: SSH connection timeout in seconds
+    :param retries: number of additional attempts if the collection fails
+    :param retry_delay: delay in seconds between two attempts
+    :return:
+    """
+    attempt = 0
+    while True:
+        try:
+            return get_cdp_neighbor_details(ip, username, password, enable_secret, timeout=timeout)
+
+        except NetMikoAuthenticationException:
+            raise
+
+        except Exception:
+            if attempt >= retries:
+                raise
+            attempt += 1
+            time.sleep(retry_delay)
+
+
+def collect_cdp_neighbor_details(ip_addresses, username, password, enable_secret, max_workers=10, timeout=None,
+                                 retries=0):
+    """
+    collect the CDP neighbor details from multiple devices in parallel, at most `max_workers` SSH sessions are
+    opened at the same time
+
+    :param ip_addresses: list of IP addresses of the devices
+    :param username: username used for the authentication
+    :param password: password used for the authentication
+    :param enable_secret: enable secret
+    :param max_workers: maximum number of concurrent SSH sessions
+    :param timeout: SSH connection timeout in seconds per device
+    :param retries: number of additional attempts per device
+    :return: tuple with a dictionary of the results (IP address to CLI output) and a dictionary of the failed
+             devices (IP address to exception)
+    """
+    results = dict()
+    failed = dict()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = dict()
+        for ip in ip_addresses:
+            future = executor.submit(get_cdp_neighbor_details_with_retry, ip, username, password, enable_secret,
+                                     timeout=timeout, retries=retries)
+            futures[future] = ip
+
+        for future in concurrent.futures.as_completed(futures):
+            ip = futures[future]
+            try:
+                results[ip] = future.result()
+                print("CDP information collected from device %s" % ip)
+
+            except Exception as ex:
+                failed[ip] = ex
+                print("collection of CDP information from device %s failed: %s" % (ip, ex))
+
+    return results, failed
+
+
+def read_inventory_file(file_name):
+    """
+    read the IP addresses from an inventory file (one address per line, empty lines and lines starting with '#'
+    are ignored)
+
+    :param file_name: name of the inventory file
+    :return: list with IP addresses
+    """
+    ip_addresses = []
+    known_addresses = set()
+    with open(file_name) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#") and line not in known_addresses:
+                ip_addresses.append(line)
+                known_addresses.add(line)
+
+    return ip_addresses
+
+
+def parse_cdp_neighbor_details(cdp_det_result):
+    """
+    parse the show cdp neighbor detail output using TextFSM
+
+    :param cdp_det_result: output of the show cdp neighbor detail command including the command prompt
+    :return: list of parsed entries
+    """
+    re_table = get_template(CDP_TEMPLATE_FILE)
+    return re_table.ParseText(cdp_det_result)
+
+
+def discover_cdp_topology(seed_ip_addresses, username, password, enable_secret, max_depth=1, max_workers=10,
+                          timeout=None, retries=0, follow_platforms=None):
+    """
+    discover the network topology starting at the given seed devices (breadth first), the management IP address of
+    every CDP neighbor is used as the next SSH target until the maximum depth is reached
+
+    Every device is contacted only once, even if it is seen by multiple neighbors or with multiple management IP
+    addresses. The devices are crawled within a thread pool (at most `max_workers` SSH sessions at the same time),
+    the next devices are scheduled as soon as the CDP information of a neighbor is parsed.
+
+    :param seed_ip_addresses: list of IP addresses where the discovery starts (depth 0)
+    :param username: username used for the authentication
+    :param password: password used for the authentication
+    :param enable_secret: enable secret
+    :param max_depth: maximum number of hops from the seed devices
+    :param max_workers: maximum number of concurrent SSH sessions
+    :param timeout: SSH connection timeout in seconds per device
+    :param retries: number of additional attempts per device
+    :param follow_platforms: optional regular expression, only neighbors with a matching platform are crawled (e.g.
+                             to skip IP phones and access points)
+    :return: tuple with the list of parsed entries from all devices and a dictionary of the failed devices (IP
+             address to exception)
+    """
+    platform_regex = re.compile(follow_platforms) if follow_platforms else None
+
+    # the frontier contains the management IP addresses and the hostnames (normalized like the nodes of the
+    # CdpGraphBuilder) that are already queued or visited
+    visited_ips = set()
+    visited_hosts = set()
+
+    fsm_results = []
+    failed = dict()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = dict()
+
+        def schedule(ip, depth):
+            future = executor.submit(get_cdp_neighbor_details_with_retry, ip, username, password, enable_secret,
+                                     timeout=timeout, retries=retries)
+            pending[future] = (ip, depth)
+            visited_ips.add(ip)
+
+        for seed_ip in seed_ip_addresses:
+            if seed_ip not in visited_ips:
+                schedule(seed_ip, 0)
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                ip, depth = pending.pop(future)
+                try:
+                    entries = parse_cdp_neighbor_details(future.result())
+                    print("CDP information collected from device %s (depth %d, %d neighbors)" % (ip, depth,
+                                                                                               len(entries)))
+
+                except Exception as ex:
+                    failed[ip] = ex
+                    print("collection of CDP information from device %s failed: %s" % (ip, ex))
+                    continue
+
+                fsm_results.extend(entries)
+                for e in entries:
+                    visited_hosts.add(normalize_hostname(e[0]))
+
+                if depth >= max_depth:
+                    continue
+
+                for e in entries:
+                    remote_host = normalize_hostname(e[1])
+                    mgmt_ip = e[2].strip()
+                    if not mgmt_ip or mgmt_ip in visited_ips or remote_host in visited_hosts:
+                        continue
+
+                    if platform_regex and not platform_regex.search(e[3]):
+                        continue
+
+                    visited_hosts.add(remote_host)
+                    schedule(mgmt_ip, depth + 1)
+
+    return fsm_results, failed
@@ -0,0 +1,136 @@
+"""
+graph builder that converts the parsed CDP neighbor details to the nodes and edges structure used by vis.js
+
+The nodes are indexed by the normalized hostname (see normalize_hostname) and the edges by the pair of node IDs,
+therefore every CDP entry is added in constant time and the graph scales linearly with the number of neighbor entries.
+A link that is seen from both devices (reciprocal CDP entries) is added only once.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.interface_names import abbreviate_interface_name
+
+
+def normalize_hostname(device_id):
+    """
+    convert a CDP device ID or the hostname from the command prompt to the plain hostname, the serial number (e.g.
+    "sw1(SSI1234ABCD)" on Nexus switches) and the domain name (e.g. "sw1.example.com") are removed
+
+    :param device_id: the CDP device ID or the hostname
+    :return: the hostname
+    """
+    hostname = device_id.split("(")[0]
+    if "." in hostname:
+        hostname = hostname.split(".")[0]
+    return hostname
+
+
+class CdpGraphBuilder(object):
+    """
+    builds the nodes and edges of the network diagram from parsed CDP entries (one or more devices)
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.edges = []
+        self._node_index = dict()
+        self._edge_index = dict()
+        self._links = set()
+
+    def _get_or_add_node(self, hostname, group, title=None):
+        """
+        returns the node for the given hostname, a new node is created if the hostname is not known
+
+        :param hostname: normalized hostname of the device
+        :param group: group of the node if a new node is created
+        :param title: title of the node if a new node is created
+        :return: the node dictionary
+        """
+        node = self._node_index.get(hostname)
+        if node is None:
+            node = {
+                "id": len(self.nodes) + 1,
+                "label": hostname,
+                "group": group
+            }
+            if title is not None:
+                node["title"] = title
+
+            self.nodes.append(node)
+            self._node_index[hostname] = node
+
+        return node
+
+    def add_entry(self, e):
+        """
+        add a single parsed CDP entry (local host, remote host, mgmt IP, platform, remote port, local port, version)
+
+        :param e: the parsed entry
+        """
+        # every device that provided CDP information is a root device, the nodes are identified by the normalized
+        # hostname because the CDP device ID may contain the domain name or the serial number
+        local_node = self._get_or_add_node(normalize_hostname(e[0]), "root_device")
+        local_node["group"] = "root_device"
+
+        # the raw device ID is only used within the title of the node
+        remote_node = self._get_or_add_node(
+            normalize_hostname(e[1]),
+            "attached_device",
+            title="<strong>Device ID:</strong><br>%s<br><br><strong>Mgmt-IP:</strong><br>%s<br><br>"
+                  "<strong>Platform</strong>:<br> %s<br><br><strong>Version:</strong><br> %s" % (e[1], e[2], e[3], e[6])
+        )
+
+        # the interface names are shortened to keep the link titles readable
+        local_port = abbreviate_interface_name(e[5])
+        remote_port = abbreviate_interface_name(e[4])
+
+        # the same link is reported by both devices if CDP information is collected from multiple devices
+        link_key = tuple(sorted([(local_node["id"], local_port), (remote_node["id"], remote_port)]))
+        if link_key in self._links:
+            return
+        self._links.add(link_key)
+
+        edge_key = tuple(sorted([local_node["id"], remote_node["id"]]))
+        edge = self._edge_index.get(edge_key)
+        if edge is not None and edge["from"] != local_node["id"]:
+            # the link titles are always from the perspective of the existing connection
+            local_port, remote_port = remote_port, local_port
+
+        if edge is None:
+            # add new connection
+            edge = {
+                "from": local_node["id"],
+                "to": remote_node["id"],
+                "title": "from: %s<br>to: %s" % (local_port, remote_port),
+                "label": "",
+                "value": 0,
+                "font": {
+                    "align": "top"
+                }
+            }
+            self.edges.append(edge)
+            self._edge_index[edge_key] = edge
+
+        else:
+            # increase the value of the existing connection
+            edge["value"] += 10
+            edge["title"] += "<hr>from: %s<br>to: %s" % (local_port, remote_port)
+
+    def add_entries(self, fsm_results):
+        """
+        add all parsed CDP entries
+
+        :param fsm_results: list of parsed entries from one or more devices
+        """
+        for e in fsm_results:
+            self.add_entry(e)
+
+    def get_data(self):
+        """
+        :return: dictionary with the nodes and edges
+        """
+        return {
+            "nodes": self.nodes,
+            "edges": self.edges
+        }
@@ -2,145 +2,108 @@
 This script collects the CDP information from a Cisco device using SSH. These information are converted to a JSON data
 structure that is used within a HTML page to create a simple network diagram.
 
+The CDP information can also be collected from multiple devices in parallel, if an inventory file (one IP address per
+line) is provided instead of a single IP address. In discovery mode, the script starts at a single device and uses
+the management IP addresses of the CDP neighbors to discover the topology (up to MAX_DEPTH hops).
+
 It uses netmiko, TextFSM and vis.js.
 """
 import json
 import os
 import webbrowser
 import sys
-import textfsm
-from netmiko import ConnectHandler
-
-
-def get_cdp_neighbor_details(ip, username, password, enable_secret):
-    """
-    get the CDP neighbor detail from the device using SSH
-
-    :param ip: IP address of the device
-    :param username: username used for the authentication
-    :param password: password used for the authentication
-    :param enable_secret: enable secret
-    :return:
-    """
-    # establish a connection to the device
-    ssh_connection = ConnectHandler(
-        device_type='cisco_ios',
-        ip=ip,
-        username=username,
-        password=password,
-        secret=enable_secret
-    )
+from cdp_collector import get_cdp_neighbor_details, collect_cdp_neighbor_details, read_inventory_file
+from cdp_collector import parse_cdp_neighbor_details, discover_cdp_topology
+from cdp_graph import CdpGraphBuilder
 
-    # enter enable mode
-    ssh_connection.enable()
+# maximum number of parallel SSH sessions if an inventory file or the discovery mode is used
+MAX_WORKERS = 20
 
-    # prepend the command prompt to the result (used to identify the local device)
-    result = ssh_connection.find_prompt() + "\n"
+# SSH connection timeout (in seconds) and number of retries per device if an inventory file or the discovery mode is
+# used
+SSH_TIMEOUT = 30
+SSH_RETRIES = 2
 
-    # execute the show cdp neighbor detail command
-    # we increase the delay_factor for this command, because it take some time if many devices are seen by CDP
-    result += ssh_connection.send_command("show cdp neighbor detail", delay_factor=2)
-
-    # close SSH connection
-    ssh_connection.disconnect()
-
-    return result
+# maximum number of hops from the seed device and the platforms that are crawled in discovery mode
+MAX_DEPTH = 3
+DISCOVERY_PLATFORMS = r"^cisco (WS-|N\dK-|C\d)"
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 5:
+    if len(sys.argv) != 5 and not (len(sys.argv) == 6 and sys.argv[1] in ["--inventory", "--discover"]):
         print("\nplease provide the following arguments:")
-        print("\tcollect-cdp-information.py <ip> <username> <password> <enable secret>\n\n")
+        print("\tcollect-cdp-information.py <ip> <username> <password> <enable secret>")
+        print("\tcollect-cdp-information.py --inventory <inventory file> <username> <password> <enable secret>")
+        print("\tcollect-cdp-information.py --discover <seed ip> <username> <password> <enable secret>\n\n")
         sys.exit(0)
 
-    target_ip = sys.argv[1]
-    username = sys.argv[2]
-    password = sys.argv[3]
-    secret = sys.argv[4]
+    username = sys.argv[-3]
+    password = sys.argv[-2]
+    secret = sys.argv[-1]
 
     try:
-        print("collect CDP information from device %s..." % target_ip)
-        cdp_det_result = get_cdp_neighbor_details(
-            ip=target_ip,
-            username=username,
-            password=password,
-            enable_secret=secret
-        )
-
-        found_hosts = []
-        nodes = []
-        edges = []
-
-        # parse the show cdp details command using TextFSM
-        print("parse results...")
-        re_table = textfsm.TextFSM(open("show_cdp_neighbor_detail.textfsm"))
-        fsm_results = re_table.ParseText(cdp_det_result)
-        local_hostname = "not discovered"
-
-        counter = 1
-        for e in fsm_results:
-            if len(nodes) == 0:
-                # add local node (always ID 1)
-                node = {
-                    "id": counter,
-                    "label": e[0],
-                    "group": "root_device"
-                }
-
-                counter += 1
-                nodes.append(node)
-
-            # add new node
-            remote_node = e[1]
-            if remote_node not in found_hosts:
-                # add new node
-                node = {
-                    "id": counter,
-                    "label": remote_node,
-                    "title": "<strong>Mgmt-IP:</strong><br>%s<br><br><strong>Platform</strong>:<br> "
-                             "%s<br><br><strong>Version:</strong><br> %s" % (e[2], e[3], e[6]),
-                    "group": "attached_device"
-                }
-                nodes.append(node)
-
-                # add new connection
-                edge = {
-                    "from": 1,
-                    "to": counter,
-                    "title": "from: %s<br>to: %s" % (e[5], e[4]),
-                    "label": "",
-                    "value": 0,
-                    "font": {
-                        "align": "top"
-                    }
-                }
-                edges.append(edge)
-                found_hosts.append(remote_node)
-                counter += 1
-
-            else:
-                # only add connection of existing device
-                current_node = None
-                for n in nodes:
-                    if remote_node in n["label"]:
-                        current_node = n
-                        break
-
-                if current_node:
-                    # search existing connection and increase the value of the link
-                    for edge in edges:
-                        if edge["to"] == current_node["id"]:
-                            edge["value"] += 10
-                            edge["title"] += "<hr>from: %s<br>to: %s" % (e[4], e[5])
-
-                else:
-                    # not found
-                    print("host %s should exist, but was not found in the dictionary." % remote_node)
-
-        data = {
-            "nodes": nodes,
-            "edges": edges
-        }
+        fsm_results = None
+        if sys.argv[1] == "--discover":
+            seed_ip = sys.argv[2]
+            print("discover CDP topology starting at device %s (max. %d hops)..." % (seed_ip, MAX_DEPTH))
+            fsm_results, failed_devices = discover_cdp_topology(
+                [seed_ip],
+                username=username,
+                password=password,
+                enable_secret=secret,
+                max_depth=MAX_DEPTH,
+                max_workers=MAX_WORKERS,
+                timeout=SSH_TIMEOUT,
+                retries=SSH_RETRIES,
+                follow_platforms=DISCOVERY_PLATFORMS
+            )
+            if failed_devices:
+                print("CDP information not collected from %d devices: %s" % (len(failed_devices),
+                                                                             ", ".join(sorted(failed_devices))))
+
+        elif sys.argv[1] == "--inventory":
+            target_ips = read_inventory_file(sys.argv[2])
+            print("collect CDP information from %d devices (max. %d in parallel)..." % (len(target_ips),
+                                                                                       MAX_WORKERS))
+            cdp_det_results, failed_devices = collect_cdp_neighbor_details(
+                target_ips,
+                username=username,
+                password=password,
+                enable_secret=secret,
+                max_workers=MAX_WORKERS,
+                timeout=SSH_TIMEOUT,
+                retries=SSH_RETRIES
+            )
+            if failed_devices:
+                print("CDP information not collected from %d devices: %s" % (len(failed_devices),
+                                                                             ", ".join(sorted(failed_devices))))
+
+            # keep the order of the inventory file
+            cdp_det_results = [cdp_det_results[ip] for ip in target_ips if ip in cdp_det_results]
+
+        else:
+            target_ip = sys.argv[1]
+            print("collect CDP information from device %s..." % target_ip)
+            cdp_det_results = [
+                get_cdp_neighbor_details(
+                    ip=target_ip,
+                    username=username,
+                    password=password,
+                    enable_secret=secret
+                )
+            ]
+
+        if fsm_results is None:
+            # parse the show cdp details command using TextFSM
+            print("parse results...")
+            fsm_results = []
+            for cdp_det_result in cdp_det_results:
+                fsm_results.extend(parse_cdp_neighbor_details(cdp_det_result))
+
+        graph_builder = CdpGraphBuilder()
+        graph_builder.add_entries(fsm_results)
+        data = graph_builder.get_data()
+
         print("write results to data.js...")
         datajs = "var data = " + json.dumps(data, indent=4)
         if os.path.exists("data.js"):
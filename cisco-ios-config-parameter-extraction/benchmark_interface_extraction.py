@@ -0,0 +1,89 @@
+"""
+benchmark for the interface parameter extraction using synthetic interface-heavy configurations
+
+The previous extraction called re_match_iter_typed for every matching child line (another scan of all child lines per
+address) and returned only the first address. get_interface_parameters traverses the child lines once and returns the
+primary and all secondary addresses.
+"""
+import time
+from ciscoconfparse import CiscoConfParse
+from ciscoconfparse.ccp_util import IPv4Obj
+from ciscoconfiparse_example import get_interface_parameters
+
+INTERFACE_COUNTS = [1000, 5000, 20000]
+SECONDARY_ADDRESS_COUNT = 2
+
+
+def create_synthetic_config(interface_count, secondary_address_count=SECONDARY_ADDRESS_COUNT):
+    """
+    create a synthetic configuration with SVIs that use a description, a primary and multiple secondary addresses
+
+    :param interface_count: number of interfaces
+    :param secondary_address_count: number of secondary addresses per interface
+    :return: list of configuration lines
+    """
+    config = ["hostname benchmark-router", "!"]
+    for i in range(interface_count):
+        config += [
+            "interface Vlan%d" % (i + 1),
+            " description benchmark interface %d" % (i + 1),
+            " ip address 10.%d.%d.1 255.255.255.0" % ((i // 256) % 256, i % 256),
+        ]
+        for secondary in range(secondary_address_count):
+            config.append(" ip address 172.%d.%d.%d 255.255.255.0 secondary" % (16 + secondary,
+                                                                               (i // 256) % 256,
+                                                                               i % 256))
+        config += [
+            " no ip redirects",
+            " no ip unreachables",
+            " no ip proxy-arp",
+            "!"
+        ]
+    return config
+
+
+def get_interface_parameters_per_match(interface_cmd):
+    """
+    the previous extraction (one re_match_iter_typed call per matching child line)
+    """
+    parameters = {
+        "description": "not set"
+    }
+    for cmd in interface_cmd.re_search_children(r"^ description "):
+        parameters["description"] = cmd.text.strip()[len("description "):]
+
+    IPv4_REGEX = r"ip\saddress\s(\S+\s+\S+)"
+    for cmd in interface_cmd.re_search_children(IPv4_REGEX):
+        ipv4_addr = interface_cmd.re_match_iter_typed(IPv4_REGEX, result_type=IPv4Obj)
+        parameters["ipv4"] = {
+            "address": ipv4_addr.ip.exploded,
+            "netmask": ipv4_addr.netmask.exploded
+        }
+    return parameters
+
+
+def measure(extraction_function, interface_cmds):
+    start = time.perf_counter()
+    address_count = 0
+    for interface_cmd in interface_cmds:
+        parameters = extraction_function(interface_cmd)
+        address_count += ("ipv4" in parameters) + len(parameters.get("ipv4_secondary", []))
+    return time.perf_counter() - start, address_count
+
+
+if __name__ == "__main__":
+    print("%10s %14s %10s %14s %10s %8s" % ("interfaces", "previous (ms)", "addresses", "single (ms)", "addresses",
+                                            "speedup"))
+    for interface_count in INTERFACE_COUNTS:
+        confparse = CiscoConfParse(create_synthetic_config(interface_count))
+        interface_cmds = confparse.find_objects(r"^interface ")
+
+        previous_time, previous_addresses = measure(get_interface_parameters_per_match, interface_cmds)
+        single_time, single_addresses = measure(get_interface_parameters, interface_cmds)
+
+        print("%10d %14.1f %10d %14.1f %10d %7.1fx" % (interface_count,
+                                                       previous_time * 1000,
+                                                       previous_addresses,
+                                                       single_time * 1000,
+                                                       single_addresses,
+                                                       previous_time / single_time))
@@ -1,20 +1,99 @@
 """
 example script how to extract parameters from a Cisco IOS configuration using ciscoconfparse
+
+usage: ciscoconfiparse_example.py [<config directory> [<output file>]]
+
+Without arguments, the parameters of the example_config.txt are printed. If a directory is given (e.g. the nightly
+configuration backups), all configuration files within the directory (including sub-directories) are parsed in
+parallel using a process pool. The results are streamed to a JSON Lines file with one record per device, including
+the parse time of the configuration.
 """
+import concurrent.futures
 import json
-from ciscoconfparse import CiscoConfParse
-from ciscoconfparse.ccp_util import IPv4Obj
+import os
+import sys
+import re
+import time
+from ipaddress import IPv4Interface
 
-if __name__ == "__main__":
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.config_cache import load_cisco_config, DEFAULT_CACHE_DIRECTORY
+from nethelpers.file_scanner import get_files_in_path
+from nethelpers.table_writers import write_json_lines
+
+config_file_name = "example_config.txt"
+output_file_name = "extracted_parameters.jsonl"
+
+# columns of the batch results
+BATCH_RESULT_HEADER = ["device", "file", "parse_time_ms", "features", "interfaces", "error"]
+
+# child commands of an interface
+DESCRIPTION_REGEX = re.compile(r"^\s+description\s(?P<description>.*)$")
+IPV4_ADDRESS_REGEX = re.compile(r"^\s+ip\saddress\s(?P<ipv4_address>\S+)\s+(?P<subnet_mask>\S+)"
+                                r"(?P<secondary>\s+secondary)?\s*$")
+
+
+def get_interface_parameters(interface_cmd):
+    """
+    extract the description and all IPv4 addresses of an interface, the child lines of the interface are traversed
+    only once
+
+    :param interface_cmd: the IOSCfgLine object of the interface command
+    :return: dictionary with the description ("not set" if no description is configured), the primary IPv4 address
+             ("ipv4", only if configured) and the secondary IPv4 addresses ("ipv4_secondary", only if configured)
+    """
+    parameters = {
+        "description": "not set"
+    }
+    secondary_addresses = []
+
+    for cmd in interface_cmd.children:
+        match = DESCRIPTION_REGEX.match(cmd.text)
+        if match:
+            parameters["description"] = match.group("description").strip()
+            continue
+
+        match = IPV4_ADDRESS_REGEX.match(cmd.text)
+        if match:
+            try:
+                ipv4_addr = IPv4Interface("%s/%s" % (match.group("ipv4_address"), match.group("subnet_mask")))
+
+            except ValueError:
+                # not an IPv4 address (e.g. "ip address dhcp client-id ...")
+                continue
+
+            address = {
+                "address": ipv4_addr.ip.exploded,
+                "netmask": ipv4_addr.netmask.exploded
+            }
+            if match.group("secondary"):
+                secondary_addresses.append(address)
+
+            else:
+                parameters["ipv4"] = address
+
+    if secondary_addresses:
+        parameters["ipv4_secondary"] = secondary_addresses
+
+    return parameters
+
+
+def extract_parameters(config_file, cache_directory=DEFAULT_CACHE_DIRECTORY):
+    """
+    extract the features and interface parameters from a Cisco IOS configuration
+
+    :param config_file: the configuration file
+    :param cache_directory: directory for the parsed configurations, the configuration is always parsed if None
+    :return: the result dictionary
+    """
     # the result dictionary
     result = {
         "features": [],
         "interfaces": {}
     }
 
-    # create CiscoConfParse object using a configuration file stored in the
-    # same directory as the script
-    confparse = CiscoConfParse("example_config.txt")
+    # create CiscoConfParse object using the configuration file (an unchanged configuration is loaded from the cache)
+    confparse = load_cisco_config(config_file, cache_directory=cache_directory)
 
     # check if OSPF is used as the routing protocol
     # the following regex_pattern matches only the "router ospf <process-id>" command (no VRFs)
@@ -24,10 +103,7 @@ if __name__ == "__main__":
     is_ospf_in_use = confparse.has_line_with(ospf_regex_pattern)
 
     if is_ospf_in_use:
-        print("==> OSPF is used in this configuration")
         result["features"].append("ospf")
-    else:
-        print("==> OSPF is not used in this configuration")
 
     # extract the interface name and description
     # first, we get all interface commands from the configuration
@@ -37,25 +113,110 @@ if __name__ == "__main__":
     for interface_cmd in interface_cmds:
         # get the interface name (remove the interface command from the configuration line)
         intf_name = interface_cmd.text[len("interface "):]
-        result["interfaces"][intf_name] = {}
-
-        # search for the description command, if not set use "not set" as value
-        result["interfaces"][intf_name]["description"] = "not set"
-        for cmd in interface_cmd.re_search_children(r"^ description "):
-            result["interfaces"][intf_name]["description"] = cmd.text.strip()[len("description "):]
-
-        # extract IP addresses if defined
-        IPv4_REGEX = r"ip\saddress\s(\S+\s+\S+)"
-        for cmd in interface_cmd.re_search_children(IPv4_REGEX):
-            # ciscoconfparse provides a helper function for this task
-            ipv4_addr = interface_cmd.re_match_iter_typed(IPv4_REGEX, result_type=IPv4Obj)
-
-            result["interfaces"][intf_name].update({
-                "ipv4": {
-                    "address": ipv4_addr.ip.exploded,
-                    "netmask": ipv4_addr.netmask.exploded
-                }
-            })
-
-    print("\nEXTRACTED PARAMETERS\n")
-    print(json.dumps(result, indent=4))
\ No newline at end of file
+        result["interfaces"][intf_name] = get_interface_parameters(interface_cmd)
+
+    return result
+
+
+def extract_parameters_with_timing(config_file):
+    """
+    extract the parameters from a configuration file and measure the parse time, errors are returned as part of the
+    result (a single broken configuration should not stop the batch)
+
+    The parsed configurations are not cached, because every configuration (e.g. of the nightly backups) is parsed only
+    once and the parse time should not include the time to write the cache file.
+
+    :param config_file: the configuration file
+    :return: list with one value per column of the BATCH_RESULT_HEADER
+    """
+    device = os.path.splitext(os.path.basename(config_file))[0]
+    start = time.perf_counter()
+    try:
+        result = extract_parameters(config_file, cache_directory=None)
+        error = None
+
+    except Exception as ex:
+        result = {"features": [], "interfaces": {}}
+        error = "%s: %s" % (type(ex).__name__, ex)
+
+    parse_time_ms = round((time.perf_counter() - start) * 1000, 3)
+    return [device, config_file, parse_time_ms, result["features"], result["interfaces"], error]
+
+
+def extract_parameters_from_directory(directory, max_workers=None, chunksize=8):
+    """
+    extract the parameters of all configuration files within the given directory in parallel using a process pool
+
+    :param directory: directory that contains the configuration files (one file per device)
+    :param max_workers: number of worker processes, defaults to the number of CPU cores
+    :param chunksize: number of files that are sent to a worker process at once
+    :return: generator with one result per device (see BATCH_RESULT_HEADER), the results are yielded in the order of
+             the files as soon as they are available
+    """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        config_files = get_files_in_path(directory, skip_hidden=True)
+        for row in executor.map(extract_parameters_with_timing, config_files, chunksize=chunksize):
+            yield row
+
+
+class BatchStatistics(object):
+    """
+    counts the devices and the parse times of the results that are passed through
+    """
+
+    def __init__(self):
+        self.devices = 0
+        self.failed = 0
+        self.total_parse_time_ms = 0.0
+        self.max_parse_time_ms = 0.0
+        self.slowest_device = None
+
+    def track(self, rows):
+        for row in rows:
+            self.devices += 1
+            if row[5]:
+                self.failed += 1
+                print("--> failed to parse %s (%s)" % (row[1], row[5]))
+
+            self.total_parse_time_ms += row[2]
+            if row[2] > self.max_parse_time_ms:
+                self.max_parse_time_ms = row[2]
+                self.slowest_device = row[0]
+
+            yield row
+
+    def __str__(self):
+        average = self.total_parse_time_ms / self.devices if self.devices else 0.0
+        return "%d devices, %d failed, parse time avg. %.1f ms, max. %.1f ms (%s)" % (
+            self.devices, self.failed, average, self.max_parse_time_ms, self.slowest_device
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # batch mode: extract the parameters of all configuration files within the given directory
+        input_directory = sys.argv[1]
+        if len(sys.argv) > 2:
+            output_file_name = sys.argv[2]
+
+        start_time = time.perf_counter()
+        statistics = BatchStatistics()
+        counter = write_json_lines(output_file_name,
+                                   BATCH_RESULT_HEADER,
+                                   statistics.track(extract_parameters_from_directory(input_directory)))
+
+        print("Write %d records to %s in %.1f seconds" % (counter, output_file_name,
+                                                          time.perf_counter() - start_time))
+        print(statistics)
+
+    else:
+        # create the result dictionary using a configuration file stored in the same directory as the script
+        result = extract_parameters(config_file_name)
+
+        if "ospf" in result["features"]:
+            print("==> OSPF is used in this configuration")
+        else:
+            print("==> OSPF is not used in this configuration")
+
+        print("\nEXTRACTED PARAMETERS\n")
+        print(json.dumps(result, indent=4))
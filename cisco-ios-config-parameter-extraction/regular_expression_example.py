@@ -1,10 +1,17 @@
 """
 example script how to extract parameters from a Cisco IOS configuration using regular expressions
+
+The configuration is read only once and split into an index of configuration sections (see
+nethelpers/config_index.py). The regular expressions are applied to the single lines of the relevant sections instead
+of the whole configuration, therefore no pattern has to backtrack over multiple lines.
 """
+import os
 import sys
-import re
 import json
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.config_index import ConfigIndex
+
 if __name__ == "__main__":
     config_file_name = "example_config.txt"
 
@@ -14,23 +21,20 @@ if __name__ == "__main__":
         "interfaces": {}
     }
 
-    # read the example configuration
+    # read the example configuration and create the section index (single pass)
     try:
-        file = open(config_file_name)
-        sample_config = file.read()
-        file.close()
+        config_index = ConfigIndex.from_file(config_file_name)
 
     except Exception as ex:
-        print("Cannot read configuration (%s), terminate script")
+        print("Cannot read configuration (%s), terminate script" % ex)
         sys.exit(1)
 
     # check if OSPF is used as the routing protocol
     # the following regex_pattern matches only the "router ospf <process-id>" command (no VRFs)
     ospf_regex_pattern = r"^router ospf \d+$"
 
-    # we will use the re.search() function, because the re.match() function ignores the MULTILINE flag
-    # if the command is not found, the return value is None
-    is_ospf_in_use = True if re.search(ospf_regex_pattern, sample_config, re.MULTILINE) else False
+    # only the sections that start with the "router" command are searched
+    is_ospf_in_use = config_index.has_section(ospf_regex_pattern, keyword="router")
 
     if is_ospf_in_use:
         print("==> OSPF is used in this configuration")
@@ -39,38 +43,28 @@ if __name__ == "__main__":
         print("==> OSPF is not used in this configuration")
 
     # extract the interface name and description
-    interface_descriptions = re.finditer(r"^(interface (?P<intf_name>\S+))\n"
-                                         r"( .*\n)*"
-                                         r"( description (?P<description>.*))\n",
-                                         sample_config,
-                                         re.MULTILINE)
+    interface_descriptions = config_index.get_interface_descriptions()
 
-    for intf_part in interface_descriptions:
-        print("==> found interface '%s' with description '%s'" % (intf_part.group("intf_name"),
-                                                                  intf_part.group("description")))
-        result["interfaces"][intf_part.group("intf_name")] = {
-            "description": intf_part.group("description") if intf_part.group("description") else "not set"
+    for intf_name, description in interface_descriptions.items():
+        print("==> found interface '%s' with description '%s'" % (intf_name, description))
+        result["interfaces"][intf_name] = {
+            "description": description if description else "not set"
         }
 
-    # extract the IPv4 address of the interfaces
-    interface_ips = re.finditer(r"^(interface (?P<intf_name>.*)\n)"
-                                r"( .*\n)*"
-                                r"( ip address (?P<ipv4_address>\S+) (?P<subnet_mask>\S+))\n",
-                                sample_config,
-                                re.MULTILINE)
+    # extract the IPv4 address of the interfaces (primary address only)
+    interface_ips = config_index.get_interface_ipv4_addresses()
 
-    for intf_ip in interface_ips:
-        print("==> found interface '%s' with ip '%s/%s'" % (intf_ip.group("intf_name"),
-                                                           intf_ip.group("ipv4_address"),
-                                                           intf_ip.group("subnet_mask")))
+    for intf_name, addresses in interface_ips.items():
+        ipv4_address, subnet_mask, _ = addresses[-1]
+        print("==> found interface '%s' with ip '%s/%s'" % (intf_name, ipv4_address, subnet_mask))
         # create interface name if not already exist
-        if intf_ip.group("intf_name") not in result["interfaces"].keys():
-            result["interfaces"][intf_ip.group("intf_name")] = {}
+        if intf_name not in result["interfaces"].keys():
+            result["interfaces"][intf_name] = {}
 
-        result["interfaces"][intf_ip.group("intf_name")].update({
+        result["interfaces"][intf_name].update({
             "ipv4": {
-                "address": intf_ip.group("ipv4_address"),
-                "netmask": intf_ip.group("subnet_mask")
+                "address": ipv4_address,
+                "netmask": subnet_mask
             }
         })
 
@@ -6,9 +6,13 @@ This script will utilize the Cisco NX-API to update the interface descriptions o
 based on CDP information.
 
 """
-import json
-import requests
-import re
+import os
+import sys
+import time
+from nxapi_client import get_client, close_clients, run_pipeline_on_hosts
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.interface_names import abbreviate_interface_name
 
 # todo update the device information when testing the script
 # get CDP information from the following clients and update there configuration
@@ -24,13 +28,19 @@ dev_password = "setup"
 # HTTPs server port, which is used on every Switch to connect to the Cisco NX-API
 HTTPS_SERVER_PORT = "8181"
 
+# maximum number of switches that are contacted at the same time (per stage)
+MAX_WORKERS = 50
+
+# maximum number of switches with collected CDP information that wait for the configuration push
+PIPELINE_QUEUE_SIZE = 100
+
+# compare the interface descriptions with the current configuration and push only the changed descriptions
+PUSH_CHANGED_DESCRIPTIONS_ONLY = True
+
 """
 ------------------------------------------------------------------------------------------------------------------------
-some helper functions to work with the Cisco NX-API
+some helper functions to work with the Cisco NX-API (the connection to every host is reused, see nxapi_client.py)
 """
-# suppress the unverified request messages (when using self-signed certificates)
-requests.packages.urllib3.disable_warnings()
-
 def nxapi_cli_conf(commands, hostname, username, password):
     """
     executes configure commands on the given host using Cisco NX-API
@@ -40,23 +50,7 @@ def nxapi_cli_conf(commands, hostname, username, password):
     :param hostname: the hostname, where the Cisco NX-API call must be executed
     :param commands: the configuration commands that should be executed on the switch using Cisco NX-API
     """
-    # convert the given configuration commands to a format which can be used within the Cisco NX-API and verify
-    # that the configuration script does not end with the termination sign (lead to an error in the last command)
-    commands = commands.replace("\n"," ; ")
-    if commands.endswith(" ; "):
-        commands = commands[:-3]
-
-    payload = {
-        "ins_api": {
-            "version": "1.2",
-            "type": "cli_conf",
-            "chunk": "0",               # do not chunk results
-            "sid": "1",
-            "input": commands,
-            "output_format": "json"
-        }
-    }
-    return nxapi_call(hostname, payload, username, password, "json")
+    return get_client(hostname, username, password, port=HTTPS_SERVER_PORT).cli_conf(commands)
 
 def nxapi_cli_show(show_command, hostname, username, password):
     """
@@ -67,18 +61,19 @@ def nxapi_cli_show(show_command, hostname, username, password):
     :param hostname: the hostname, where the Cisco NX-API call must be executed
     :param show_command: the show command, that should be executed on the switch
     """
-    payload = [
-        {
-            "jsonrpc": "2.0",
-            "method": "cli",
-            "params": {
-                "cmd": show_command,
-                "version": 1.2
-            },
-            "id": 1
-        }
-    ]
-    return nxapi_call(hostname, payload, username, password, "json-rpc")
+    return get_client(hostname, username, password, port=HTTPS_SERVER_PORT).cli_show(show_command)
+
+def nxapi_cli_show_batch(show_commands, hostname, username, password):
+    """
+    execute multiple show commands on the given host using a single Cisco NX-API call
+
+    :param username: username for authentication
+    :param password: password for authentication
+    :param hostname: the hostname, where the Cisco NX-API call must be executed
+    :param show_commands: list of show commands, that should be executed on the switch
+    :return: list with the JSON-RPC response of every command (same order as the commands)
+    """
+    return get_client(hostname, username, password, port=HTTPS_SERVER_PORT).cli_show_batch(show_commands)
 
 def nxapi_call(hostname, payload, username, password, content_type="json"):
     """
@@ -90,48 +85,115 @@ def nxapi_call(hostname, payload, username, password, content_type="json"):
     :param password: password for authentication
     :param content_type: the content type of the payload, defaults to "JSON"
     """
-    headers={'content-type':'application/%s' % content_type}
-    response = requests.post("https://%s:%s/ins" % (hostname, HTTPS_SERVER_PORT),
-                             auth=(username, password),
-                             headers=headers,
-                             data=json.dumps(payload),
-                             verify=False,                      # disable SSH certificate verification
-                             timeout=4)
-    if response.status_code == 200:
-        # verify result if a cli_conf operation was performed
-        if "ins_api" in payload:
-            if "type" in payload['ins_api'].keys():
-                if "cli_conf" in payload['ins_api']['type']:
-                    for result in response.json()['ins_api']['outputs']['output']:
-                        if result['code'] != "200":
-                            print("--> partial configuration failed, please verify your configuration!")
-                            break
-        return response.json()
-    else:
-        msg = "call to %s failed, status code %d (%s)" % (target_host,
-                                                          response.status_code,
-                                                          response.content.decode("utf-8"))
-        print(msg)
-        raise Exception(msg)
+    return get_client(hostname, username, password, port=HTTPS_SERVER_PORT).call(payload, content_type)
 
 def interface_shortener(interface_name):
     """
-    makes Cisco interface names shorter (e.g. 'Ethernet' to 'Eth')
+    makes Cisco interface names shorter (e.g. 'Ethernet' to 'Eth', see nethelpers/interface_names.py)
 
     :param interface_name:
     """
-    interface_short_string_map = [
-        { "from": "Ethernet", "to": "Eth"},
-        { "from": "GigabitEthernet", "to": "Gi"},
-        { "from": "FastEthernet", "to": "Fa"},
-        { "from": "TenGigabitEthernet", "to": "Te"},
-    ]
-    result = interface_name
-    for s in interface_short_string_map:
-        if re.match(r"^%s" % s['from'], result) is not None:
-            result = result.replace(s['from'], s['to'])
-            break
-    return result
+    return abbreviate_interface_name(interface_name, platform="nxos")
+
+def parse_cdp_neighbors(body):
+    """
+    convert the body of the "show cdp neighbor detail" command to a list of neighbor entries
+
+    :param body: body of the NX-API response
+    :return: list with dictionaries that contain the local interface and the remote host, interface and mgmt IP
+    """
+    # dump neighbors
+    neighbor_statements = body['TABLE_cdp_neighbor_detail_info']['ROW_cdp_neighbor_detail_info']
+
+    host_neighbors = list()
+
+    if type(neighbor_statements) is not list:
+        # convert to a list if only a single entry in a dictionary is received from the device
+        neighbor_statements = [neighbor_statements]
+
+    for neighbor in neighbor_statements:
+        # remove SN and/or DNS prefix from hostname
+        remote_host = neighbor['device_id'].split("(")[0]
+        if "." in remote_host:
+            remote_host = remote_host.split(".")[0]
+
+        # descriptions should not be that long...
+        local_interface = interface_shortener(neighbor['intf_id'])
+        remote_interface = interface_shortener(neighbor['port_id'])
+
+        entry = {
+            "local_interface": local_interface,
+            "remote_host": remote_host,
+            "remote_interface": remote_interface,
+            "remote_mgmt_ip": neighbor['v4mgmtaddr']
+        }
+        host_neighbors.append(entry)
+
+    return host_neighbors
+
+def parse_interface_descriptions(body):
+    """
+    convert the body of the "show interface description" command to a dictionary
+
+    :param body: body of the NX-API response
+    :return: dictionary with the (shortened) interface name and the current description
+    """
+    rows = body.get('TABLE_interface', {}).get('ROW_interface', [])
+    if type(rows) is not list:
+        rows = [rows]
+
+    descriptions = dict()
+    for row in rows:
+        descriptions[interface_shortener(row['interface'])] = row.get('desc', "")
+    return descriptions
+
+def get_host_neighbors(target_host):
+    """
+    request the CDP information from the switch and convert it to a list of neighbor entries
+
+    :param target_host: the hostname of the switch
+    :return: list with dictionaries that contain the local interface and the remote host, interface and mgmt IP
+    """
+    print("request CDP information for switch: %s" % target_host)
+    result = nxapi_cli_show("show cdp neighbor detail", target_host, dev_username, dev_password)
+    return parse_cdp_neighbors(result['result']['body'])
+
+def get_host_neighbors_and_descriptions(target_host):
+    """
+    request the CDP information and the current interface descriptions from the switch (single NX-API call)
+
+    :param target_host: the hostname of the switch
+    :return: tuple with the list of neighbor entries and a dictionary of the current interface descriptions (None
+             if the descriptions are not available)
+    """
+    print("request CDP information and interface descriptions for switch: %s" % target_host)
+    cdp_result, description_result = nxapi_cli_show_batch(["show cdp neighbor detail", "show interface description"],
+                                                           target_host, dev_username, dev_password)
+    if "result" not in cdp_result:
+        raise Exception("show cdp neighbor detail failed on %s: %s" % (target_host, cdp_result.get("error")))
+
+    current_descriptions = None
+    if "result" in description_result:
+        current_descriptions = parse_interface_descriptions(description_result['result']['body'])
+
+    return parse_cdp_neighbors(cdp_result['result']['body']), current_descriptions
+
+def create_change_script(host_neighbors, current_descriptions=None):
+    """
+    create the change script for a switch based on the neighbor entries, if the current descriptions are given,
+    only interfaces with a different description are part of the change script
+
+    :param host_neighbors: list of neighbor entries from the get_host_neighbors function
+    :param current_descriptions: optional dictionary with the (shortened) interface name and the current description
+    """
+    change_script = ""
+    for entry in host_neighbors:
+        description = "*** %s, %s (%s)" % (entry['remote_interface'], entry['remote_host'], entry['remote_mgmt_ip'])
+        if current_descriptions is not None and current_descriptions.get(entry['local_interface']) == description:
+            continue
+
+        change_script += "interface %s\n description %s\n" % (entry['local_interface'], description)
+    return change_script
 
 """
 ------------------------------------------------------------------------------------------------------------------------
@@ -142,51 +204,37 @@ if __name__ == "__main__":
     print("----------------------------------------")
     print("start the interface description cleaner ")
     print("----------------------------------------")
-    host_results = dict()
-    for target_host in hosts:
-        print("request CDP information for switch: %s" % target_host)
-        result = nxapi_cli_show("show cdp neighbor detail", target_host, dev_username, dev_password)
-
-        # dump neighbors
-        neighbor_statements = result['result']['body']['TABLE_cdp_neighbor_detail_info']['ROW_cdp_neighbor_detail_info']
-
-        host_neighbors = list()
-
-        if type(neighbor_statements) is not list:
-            # convert to a list if only a single entry in a dictionary is received from the device
-            neighbor_statements = [neighbor_statements]
-
-        for neighbor in neighbor_statements:
-            # remove SN and/or DNS prefix from hostname
-            remote_host = neighbor['device_id'].split("(")[0]
-            if "." in remote_host:
-                remote_host = remote_host.split(".")[0]
-
-            # descriptions should not be that long...
-            local_interface = interface_shortener(neighbor['intf_id'])
-            remote_interface = interface_shortener(neighbor['port_id'])
-
-            entry = {
-                "local_interface": local_interface,
-                "remote_host": remote_host,
-                "remote_interface": remote_interface,
-                "remote_mgmt_ip": neighbor['v4mgmtaddr']
-            }
-            host_neighbors.append(entry)
-
-        host_results[target_host] = host_neighbors
-
-    # generate change script per device and push to it
-    for host in host_results.keys():
-        # create change script
-        change_script = ""
-        for entry in host_results[host]:
-            change_script += "interface %s\n description *** %s, %s (%s)\n" % (entry['local_interface'],
-                                                                               entry['remote_interface'],
-                                                                               entry['remote_host'],
-                                                                               entry['remote_mgmt_ip'])
+    # collect the CDP information from all switches in parallel, the change script of a switch is generated and
+    # pushed as soon as its CDP information is available
+    def collect_host_state(host):
+        if PUSH_CHANGED_DESCRIPTIONS_ONLY:
+            return get_host_neighbors_and_descriptions(host)
+        return get_host_neighbors(host), None
+
+    def push_change_script(host, host_state):
+        change_script = create_change_script(*host_state)
+        if not change_script:
+            print("no description changes: %s" % host)
+            return None
+
         # verify that  the output is correct
         print("apply change script: %s" % host)
-        response = nxapi_cli_conf(change_script, host, dev_username, dev_password)
-
-    print("finished successful")
+        return nxapi_cli_conf(change_script, host, dev_username, dev_password)
+
+    start_time = time.perf_counter()
+    responses, failed_hosts, stage_metrics = run_pipeline_on_hosts(hosts,
+                                                                   collect_host_state,
+                                                                   push_change_script,
+                                                                   collect_workers=MAX_WORKERS,
+                                                                   push_workers=MAX_WORKERS,
+                                                                   queue_size=PIPELINE_QUEUE_SIZE)
+    close_clients()
+
+    for metrics in stage_metrics:
+        print(metrics)
+    print("total runtime: %.3fs" % (time.perf_counter() - start_time))
+
+    if failed_hosts:
+        print("finished with errors on %d hosts: %s" % (len(failed_hosts), ", ".join(sorted(failed_hosts))))
+    else:
+        print("finished successful")
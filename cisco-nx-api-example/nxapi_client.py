@@ -0,0 +1,364 @@
+"""
+Cisco NX-API client with connection pooling
+
+Every host gets its own requests session, therefore the TLS connection is kept alive and reused for all calls to the
+same switch. The run_on_hosts function executes a task for many switches in parallel with a limited number of
+threads, the run_pipeline_on_hosts function connects a collect and a push stage using a bounded queue.
+"""
+import concurrent.futures
+import json
+import queue
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# HTTPs server port, which is used on every Switch to connect to the Cisco NX-API
+HTTPS_SERVER_PORT = "8181"
+
+# default number of switches that are contacted at the same time
+DEFAULT_MAX_WORKERS = 50
+
+# suppress the unverified request messages (when using self-signed certificates)
+requests.packages.urllib3.disable_warnings()
+
+
+class NxapiClient(object):
+    """
+    NX-API client for a single switch, the HTTPS connection is reused for all calls
+    """
+
+    def __init__(self, hostname, username, password, port=HTTPS_SERVER_PORT, verify=False, timeout=4):
+        """
+        :param hostname: the hostname, where the Cisco NX-API calls are executed
+        :param username: username for authentication
+        :param password: password for authentication
+        :param port: HTTPs server port of the NX-API
+        :param verify: verify the SSL certificate of the switch
+        :param timeout: timeout in seconds for every call
+        """
+        self.hostname = hostname
+        self.url = "https://%s:%s/ins" % (hostname, port)
+        self.timeout = timeout
+        self.verify = verify
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+    def call(self, payload, content_type="json"):
+        """
+        common NX-API call which includes some basic verification of the response
+
+        :param payload: the payload for the NX-API call
+        :param content_type: the content type of the payload, defaults to "JSON"
+        """
+        headers = {'content-type': 'application/%s' % content_type}
+        response = self.session.post(self.url,
+                                     headers=headers,
+                                     data=json.dumps(payload),
+                                     verify=self.verify,                # disable SSH certificate verification
+                                     timeout=self.timeout)
+        if response.status_code == 200:
+            # verify result if a cli_conf operation was performed
+            if "ins_api" in payload:
+                if "type" in payload['ins_api'].keys():
+                    if "cli_conf" in payload['ins_api']['type']:
+                        outputs = response.json()['ins_api']['outputs']['output']
+                        if type(outputs) is not list:
+                            # a single output is not returned as a list
+                            outputs = [outputs]
+                        for result in outputs:
+                            if result['code'] != "200":
+                                print("--> partial configuration failed on %s, please verify your configuration!" %
+                                      self.hostname)
+                                break
+            return response.json()
+        else:
+            msg = "call to %s failed, status code %d (%s)" % (self.hostname,
+                                                              response.status_code,
+                                                              response.content.decode("utf-8"))
+            print(msg)
+            raise Exception(msg)
+
+    def cli_conf(self, commands):
+        """
+        executes configure commands on the switch
+
+        :param commands: the configuration commands that should be executed on the switch using Cisco NX-API
+        """
+        # convert the given configuration commands to a format which can be used within the Cisco NX-API and verify
+        # that the configuration script does not end with the termination sign (lead to an error in the last command)
+        commands = commands.replace("\n", " ; ")
+        if commands.endswith(" ; "):
+            commands = commands[:-3]
+
+        payload = {
+            "ins_api": {
+                "version": "1.2",
+                "type": "cli_conf",
+                "chunk": "0",               # do not chunk results
+                "sid": "1",
+                "input": commands,
+                "output_format": "json"
+            }
+        }
+        return self.call(payload, "json")
+
+    def cli_show(self, show_command):
+        """
+        execute show command on the switch
+
+        :param show_command: the show command, that should be executed on the switch
+        """
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": "cli",
+                "params": {
+                    "cmd": show_command,
+                    "version": 1.2
+                },
+                "id": 1
+            }
+        ]
+        return self.call(payload, "json-rpc")
+
+    def cli_show_batch(self, show_commands):
+        """
+        execute multiple show commands on the switch within a single JSON-RPC batch request
+
+        :param show_commands: list of show commands, that should be executed on the switch
+        :return: list with the JSON-RPC response of every command (same order as the commands), a response contains
+                 either a "result" or an "error" key
+        """
+        payload = []
+        for request_id, show_command in enumerate(show_commands, start=1):
+            payload.append({
+                "jsonrpc": "2.0",
+                "method": "cli",
+                "params": {
+                    "cmd": show_command,
+                    "version": 1.2
+                },
+                "id": request_id
+            })
+
+        if not payload:
+            return []
+
+        responses = self.call(payload, "json-rpc")
+        if type(responses) is not list:
+            # a single response is not returned as a list
+            responses = [responses]
+
+        # map the responses back to the commands using the request id
+        responses_by_id = dict()
+        for response in responses:
+            responses_by_id[response.get("id")] = response
+
+        results = []
+        for request_id, show_command in enumerate(show_commands, start=1):
+            if request_id not in responses_by_id:
+                raise Exception("no response for command '%s' received from %s" % (show_command, self.hostname))
+            results.append(responses_by_id[request_id])
+
+        return results
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+_clients = dict()
+_clients_lock = threading.Lock()
+
+
+def get_client(hostname, username, password, port=HTTPS_SERVER_PORT):
+    """
+    returns the client for the given host, the client (and its connection) is reused for all further calls
+
+    :param hostname: the hostname, where the Cisco NX-API calls are executed
+    :param username: username for authentication
+    :param password: password for authentication
+    :param port: HTTPs server port of the NX-API
+    :return: NxapiClient instance
+    """
+    key = (hostname, port, username, password)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = NxapiClient(hostname, username, password, port=port)
+            _clients[key] = client
+
+    return client
+
+
+def close_clients():
+    """
+    close the connections of all cached clients
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def run_on_hosts(hosts, task, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    executes the task for every host in parallel, at most `max_workers` hosts are contacted at the same time
+
+    :param hosts: list of hostnames
+    :param task: function that is called with the hostname as the only argument
+    :param max_workers: maximum number of concurrent hosts
+    :return: tuple with a dictionary of the results (hostname: return value of the task) and a dictionary of the
+             failed hosts (hostname: exception)
+    """
+    results = dict()
+    failed = dict()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = dict()
+        for host in hosts:
+            futures[executor.submit(task, host)] = host
+
+        for future in concurrent.futures.as_completed(futures):
+            host = futures[future]
+            try:
+                results[host] = future.result()
+
+            except Exception as ex:
+                failed[host] = ex
+                print("--> call to %s failed: %s" % (host, ex))
+
+    return results, failed
+
+
+class StageMetrics(object):
+    """
+    metrics of a pipeline stage (thread-safe)
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+        self.max_time = 0.0
+        self.max_queue_size = 0
+        self._lock = threading.Lock()
+
+    def add(self, duration, failed=False):
+        with self._lock:
+            self.processed += 1
+            if failed:
+                self.failed += 1
+            self.busy_time += duration
+            self.max_time = max(self.max_time, duration)
+
+    def observe_queue(self, queue_size):
+        with self._lock:
+            self.max_queue_size = max(self.max_queue_size, queue_size)
+
+    def __str__(self):
+        average = self.busy_time / self.processed if self.processed else 0.0
+        return "%s: %d processed, %d failed, avg. %.3fs, max. %.3fs, max. queue size %d" % (
+            self.name, self.processed, self.failed, average, self.max_time, self.max_queue_size
+        )
+
+
+def run_pipeline_on_hosts(hosts, collect_task, push_task, collect_workers=DEFAULT_MAX_WORKERS,
+                          push_workers=DEFAULT_MAX_WORKERS, queue_size=100):
+    """
+    executes a two stage pipeline for every host, the result of the collect task is pushed as soon as it is available
+    (the total runtime approaches the maximum of both stages instead of their sum)
+
+    The collect stage is blocked if `queue_size` results are waiting for the push stage.
+
+    :param hosts: list of hostnames
+    :param collect_task: function that is called with the hostname, the return value is passed to the push task
+    :param push_task: function that is called with the hostname and the result of the collect task
+    :param collect_workers: maximum number of hosts in the collect stage at the same time
+    :param push_workers: maximum number of hosts in the push stage at the same time
+    :param queue_size: maximum number of collected results that wait for the push stage
+    :return: tuple with a dictionary of the results (hostname: return value of the push task), a dictionary of the
+             failed hosts (hostname: exception) and a list with the metrics of both stages
+    """
+    host_queue = queue.Queue()
+    push_queue = queue.Queue(maxsize=queue_size)
+    collect_metrics = StageMetrics("collect")
+    push_metrics = StageMetrics("push")
+
+    results = dict()
+    failed = dict()
+    results_lock = threading.Lock()
+
+    def record_failure(host, ex):
+        with results_lock:
+            failed[host] = ex
+        print("--> call to %s failed: %s" % (host, ex))
+
+    def collect_worker():
+        while True:
+            host = host_queue.get()
+            if host is None:
+                return
+
+            start = time.perf_counter()
+            try:
+                collected = collect_task(host)
+
+            except Exception as ex:
+                collect_metrics.add(time.perf_counter() - start, failed=True)
+                record_failure(host, ex)
+                continue
+
+            collect_metrics.add(time.perf_counter() - start)
+            push_queue.put((host, collected))
+            push_metrics.observe_queue(push_queue.qsize())
+
+    def push_worker():
+        while True:
+            item = push_queue.get()
+            if item is None:
+                return
+
+            host, collected = item
+            start = time.perf_counter()
+            try:
+                result = push_task(host, collected)
+
+            except Exception as ex:
+                push_metrics.add(time.perf_counter() - start, failed=True)
+                record_failure(host, ex)
+                continue
+
+            push_metrics.add(time.perf_counter() - start)
+            with results_lock:
+                results[host] = result
+
+    for host in hosts:
+        host_queue.put(host)
+
+    collect_threads = [threading.Thread(target=collect_worker) for _ in range(collect_workers)]
+    push_threads = [threading.Thread(target=push_worker) for _ in range(push_workers)]
+    for thread in collect_threads + push_threads:
+        thread.daemon = True
+        thread.start()
+
+    # stop the collect workers after all hosts are collected, afterwards the push workers
+    for _ in collect_threads:
+        host_queue.put(None)
+    for thread in collect_threads:
+        thread.join()
+
+    for _ in push_threads:
+        push_queue.put(None)
+    for thread in push_threads:
+        thread.join()
+
+    return results, failed, [collect_metrics, push_metrics]
@@ -0,0 +1,217 @@
+"""
+local HTTPS stand-in for the Cisco NX-API (for tests without a Nexus switch)
+
+The server answers the "show cdp neighbor detail" command with generated neighbors and applies interface descriptions
+that are sent using cli_conf. Every hostname that points to the server is handled as a separate switch (e.g. 127.0.0.1
+and localhost, or any address from 127.0.0.0/8 if the server is bound to 0.0.0.0). A self-signed certificate is
+created on startup (requires the cryptography module).
+
+usage: nxapi_test_server.py [<port>] [<latency in seconds>] [<bind address>]
+"""
+import datetime
+import json
+import os
+import socketserver
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+NEIGHBOR_COUNT = 4
+
+
+def create_self_signed_certificate(directory):
+    """
+    create a self-signed certificate and key for localhost
+
+    :param directory: directory where the certificate and key files are created
+    :return: tuple with the certificate and key file
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.utcnow()
+    certificate = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(
+        key.public_key()
+    ).serial_number(x509.random_serial_number()).not_valid_before(now).not_valid_after(
+        now + datetime.timedelta(days=1)
+    ).sign(key, hashes.SHA256())
+
+    cert_file = os.path.join(directory, "nxapi_test_server.crt")
+    key_file = os.path.join(directory, "nxapi_test_server.key")
+    with open(cert_file, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_file, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM,
+                                  serialization.PrivateFormat.TraditionalOpenSSL,
+                                  serialization.NoEncryption()))
+    return cert_file, key_file
+
+
+class SwitchState(object):
+    """
+    state of a simulated switch (CDP neighbors and interface descriptions)
+    """
+
+    def __init__(self, hostname, neighbor_count=NEIGHBOR_COUNT):
+        self.hostname = hostname
+        self.lock = threading.Lock()
+        self.descriptions = dict()
+        self.config_calls = 0
+        self.neighbors = []
+        for i in range(1, neighbor_count + 1):
+            self.neighbors.append({
+                "device_id": "%s-peer-%d.example.local(SSI1234567%d)" % (hostname.replace(".", "-"), i, i),
+                "intf_id": "Ethernet1/%d" % i,
+                "port_id": "Ethernet2/%d" % i,
+                "v4mgmtaddr": "192.0.2.%d" % i,
+                "platform_id": "N5K-C5548UP"
+            })
+
+    def show(self, command):
+        """
+        returns the body of the show command
+        """
+        if command == "show cdp neighbor detail":
+            rows = self.neighbors if len(self.neighbors) != 1 else self.neighbors[0]
+            return {"TABLE_cdp_neighbor_detail_info": {"ROW_cdp_neighbor_detail_info": rows}}
+
+        if command == "show interface description":
+            rows = []
+            with self.lock:
+                for neighbor in self.neighbors:
+                    rows.append({
+                        "interface": neighbor["intf_id"],
+                        "type": "eth",
+                        "speed": "10G",
+                        "desc": self.descriptions.get(neighbor["intf_id"], "")
+                    })
+            return {"TABLE_interface": {"ROW_interface": rows if len(rows) != 1 else rows[0]}}
+
+        raise ValueError("unknown command: %s" % command)
+
+    def configure(self, commands):
+        """
+        applies the configuration commands (only interface descriptions are stored)
+
+        :return: list with one output per command
+        """
+        outputs = []
+        with self.lock:
+            self.config_calls += 1
+            interface = None
+            for command in commands.split(" ; "):
+                command = command.strip()
+                if command.startswith("interface "):
+                    interface = command[len("interface "):]
+                    if interface.startswith("Eth") and not interface.startswith("Ethernet"):
+                        interface = "Ethernet" + interface[len("Eth"):]
+                elif command.startswith("description ") and interface:
+                    self.descriptions[interface] = command[len("description "):]
+                outputs.append({"code": "200", "msg": "Success", "body": {}})
+        return outputs
+
+
+class NxapiRequestHandler(BaseHTTPRequestHandler):
+    """
+    handles the NX-API calls (JSON-RPC and ins_api cli_conf)
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8"))
+        if self.path != "/ins":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        switch = self.server.get_switch(self.headers["Host"].split(":")[0])
+        if type(payload) is list:
+            # JSON-RPC request, a single request is answered with a single object
+            responses = []
+            for request in payload:
+                try:
+                    responses.append({"jsonrpc": "2.0",
+                                      "result": {"body": switch.show(request["params"]["cmd"])},
+                                      "id": request["id"]})
+                except ValueError as ex:
+                    responses.append({"jsonrpc": "2.0",
+                                      "error": {"code": -32602, "message": str(ex)},
+                                      "id": request["id"]})
+            self._send_json(200, responses[0] if len(responses) == 1 else responses)
+
+        elif payload.get("ins_api", {}).get("type") == "cli_conf":
+            outputs = switch.configure(payload["ins_api"]["input"])
+            self._send_json(200, {"ins_api": {"outputs": {"output": outputs if len(outputs) != 1 else outputs[0]}}})
+
+        else:
+            self._send_json(400, {"error": "unsupported request"})
+
+
+class NxapiTestServer(socketserver.ThreadingMixIn, HTTPServer):
+    """
+    threaded HTTPS server that simulates multiple switches
+    """
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, port=8181, latency=0.0, neighbor_count=NEIGHBOR_COUNT, bind_address="127.0.0.1"):
+        HTTPServer.__init__(self, (bind_address, port), NxapiRequestHandler)
+        self.latency = latency
+        self.neighbor_count = neighbor_count
+        self.switches = dict()
+        self._switches_lock = threading.Lock()
+
+        self._cert_directory = tempfile.mkdtemp()
+        cert_file, key_file = create_self_signed_certificate(self._cert_directory)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+
+    def get_switch(self, hostname):
+        with self._switches_lock:
+            if hostname not in self.switches:
+                self.switches[hostname] = SwitchState(hostname, self.neighbor_count)
+            return self.switches[hostname]
+
+    def start(self):
+        """
+        start the server in a background thread
+        """
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+if __name__ == "__main__":
+    server_port = int(sys.argv[1]) if len(sys.argv) > 1 else 8181
+    server_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server_address = sys.argv[3] if len(sys.argv) > 3 else "127.0.0.1"
+
+    server = NxapiTestServer(server_port, server_latency, bind_address=server_address)
+    print("NX-API test server listening on https://%s:%d/ins (latency %.2fs)" % (server_address, server_port,
+                                                                               server_latency))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
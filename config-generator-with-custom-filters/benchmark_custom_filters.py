@@ -0,0 +1,86 @@
+"""
+benchmark for the custom filters using the ip-interface-config.jinja2 template with 100k interfaces
+
+The template is rendered for both vendors with the previous filter implementations (an IPv4Network object and a full
+slugify call per interface) and with the cached filters from nethelpers/jinja_filters.py. The interface names are
+taken from a limited set of VLAN names, like in a real network where the same VLANs exist at many sites.
+"""
+import os
+import sys
+import time
+import jinja2
+from ipaddress import IPv4Network
+from slugify import slugify
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.jinja_filters import register_filters, slugify_string
+
+template_file = "ip-interface-config.jinja2"
+INTERFACE_COUNT = 100000
+VLAN_NAME_COUNT = 500
+VENDORS = ["Cisco_IOS", "Juniper"]
+
+
+def uncached_dotted_decimal(prefix_length):
+    try:
+        ip = IPv4Network("0.0.0.0/" + str(prefix_length))
+        return ip.netmask
+    except Exception:
+        return "[INVALID VALUE(" + str(prefix_length) + ")]"
+
+
+def uncached_slugify_string(text):
+    return slugify(text)
+
+
+def create_synthetic_interfaces(interface_count=INTERFACE_COUNT, vlan_name_count=VLAN_NAME_COUNT):
+    """
+    create the interface parameters for the template
+
+    :param interface_count: number of interfaces
+    :param vlan_name_count: number of different VLAN names
+    :return: list of interface dictionaries
+    """
+    interfaces = []
+    for i in range(interface_count):
+        interfaces.append({
+            "vlan_id": i % 4000 + 1,
+            "ip_address": "10.%d.%d.1" % ((i // 256) % 256, i % 256),
+            "prefix_length": 20 + i % 11,
+            "name": "Site %d VLAN %d" % (i % vlan_name_count, i % 20)
+        })
+    return interfaces
+
+
+def measure(env, interfaces):
+    template = env.get_template(template_file)
+    start = time.perf_counter()
+    size = 0
+    for vendor in VENDORS:
+        size += len(template.render(vendor=vendor, interfaces=interfaces))
+    return time.perf_counter() - start, size
+
+
+if __name__ == "__main__":
+    interfaces = create_synthetic_interfaces()
+
+    uncached_env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath="."),
+                                      trim_blocks=True,
+                                      lstrip_blocks=True)
+    uncached_env.filters["dotted_decimal"] = uncached_dotted_decimal
+    uncached_env.filters["slugify_string"] = uncached_slugify_string
+
+    cached_env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath="."),
+                                    trim_blocks=True,
+                                    lstrip_blocks=True)
+    register_filters(cached_env)
+
+    uncached_time, uncached_size = measure(uncached_env, interfaces)
+    cached_time, cached_size = measure(cached_env, interfaces)
+    if uncached_size != cached_size:
+        print("WARNING: the rendered configurations are different")
+
+    print("%d interfaces, %d vendors" % (len(interfaces), len(VENDORS)))
+    print("%-20s %10.1f ms" % ("uncached filters", uncached_time * 1000))
+    print("%-20s %10.1f ms (%.1fx faster)" % ("cached filters", cached_time * 1000, uncached_time / cached_time))
+    print("slugify cache: %s" % (slugify_string.cache_info(),))
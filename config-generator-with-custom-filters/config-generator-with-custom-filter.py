@@ -6,51 +6,38 @@ This script will generate an interface configuration for a Cisco IOS and Juniper
 parameters to demonstrate the use of custom filters with the Jinja2 template engine.
 
 """
-import jinja2
 import json
 import os
-from ipaddress import IPv4Network
-from slugify import slugify
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.config_rendering import ConfigRenderer, RenderManifest, render_configs
+from nethelpers.jinja_filters import FILTERS
 
 parameter_file = "parameters.json"
 template_file = "ip-interface-config.jinja2"
 output_directory = "_output"
 
+# the compiled templates are cached in the "_template_cache" directory (Jinja2 bytecode cache), if enabled the
+# templates are compiled to python modules instead
+use_precompiled_templates = False
 
-def dotted_decimal(prefix_length):
-    """
-    converts the given prefix to a IPv4 dotted decimal representation
-    :param prefix_length:
-    :return:
-    """
-    try:
-        ip = IPv4Network("0.0.0.0/" + str(prefix_length))
-        return ip.netmask
-    except Exception:
-        return "[INVALID VALUE(" + str(prefix_length) + ")]"
-
-
-def slugify_string(text):
-    """
-    convert the given string to a slug
-    :param text:
-    :return:
-    """
-    return slugify(text)
+# only the configurations with a changed parameter record, template or custom filter are created again (the
+# fingerprints are stored within the output directory)
+incremental_generation = True
 
 
 if __name__ == "__main__":
-    # create Jinja2 template environment with the link to the current directory
-    env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath="."),
-                             trim_blocks=True,
-                             lstrip_blocks=True)
-
-    # register custom filters on the jinja2 environment
-    env.filters["dotted_decimal"] = dotted_decimal
-    env.filters["slugify_string"] = slugify_string
-
-    # load template file
-    template = env.get_template(template_file)
+    # create the renderer for the template file within the current directory, the custom filters (dotted_decimal and
+    # slugify_string from nethelpers/jinja_filters.py) are registered on the jinja2 environment (the compiled template
+    # is loaded from the cache if the template is not changed)
+    renderer = ConfigRenderer(template_file,
+                              output_directory,
+                              output_file_pattern="%(vendor)s-ip_interfaces.config",
+                              filters=FILTERS,
+                              precompile=use_precompiled_templates,
+                              trim_blocks=True,
+                              lstrip_blocks=True)
 
     # just make sure that the output directory exists
     if not os.path.exists(output_directory):
@@ -60,18 +47,22 @@ if __name__ == "__main__":
     vendors = ["Cisco_IOS", "Juniper"]
     interface_parameter_json = json.load(open(parameter_file))
 
-    # create the templates for all vendors
-    print("Create templates for all vendors...")
+    # create the parameters for all vendors
+    parameters = []
     for vendor in vendors:
         parameter = {
             "vendor": vendor,
             "feature_string": ["Infrastructure ACLs"],
         }
         parameter.update(interface_parameter_json.copy())
-        result = template.render(parameter)
-        f = open(os.path.join(output_directory, vendor + "-ip_interfaces.config"), "w")
-        f.write(result)
-        f.close()
-        print("Configuration '%s' created for %s" % (vendor + "-ip_interfaces.config", vendor))
+        parameters.append(parameter)
+
+    # create the templates for all vendors
+    print("Create templates for all vendors...")
+    manifest = RenderManifest(renderer) if incremental_generation else None
+    for output_file in render_configs(renderer, parameters, max_workers=1, manifest=manifest):
+        print("Configuration '%s' created..." % os.path.basename(output_file))
 
+    if manifest is not None:
+        print("%d configurations unchanged..." % manifest.skipped)
     print("DONE")
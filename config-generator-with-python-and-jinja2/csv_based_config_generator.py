@@ -1,46 +1,66 @@
-import jinja2
 import os
+import sys
+from ipaddress import IPv4Address
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.config_rendering import ConfigRenderer, RenderManifest, render_configs
+from nethelpers.jinja_filters import FILTERS
+from nethelpers.parameter_readers import ParameterValidationError, read_csv_parameters
 
 template_file = "switch.j2"
 csv_parameter_file = "parameters.csv"
-config_parameters = []
 output_directory = "_output"
 
-# 1. read the contents from the CSV files
-print("Read CSV parameter file...")
-f = open(csv_parameter_file)
-csv_content = f.read()
-f.close()
-
-# 2. for Jinja2, we need to convert the given CSV file into the a python
-# dictionary to get the script a bit more reusable, I will not statically
-# limit the possible header values (and therefore the variables)
-print("Convert CSV file to dictionaries...")
-csv_lines = csv_content.splitlines()
-headers = csv_lines[0].split(";")
-for i in range(1, len(csv_lines)):
-    values = csv_lines[i].split(";")
-    parameter_dict = dict()
-    for h in range(0, len(headers)):
-        parameter_dict[headers[h]] = values[h]
-    config_parameters.append(parameter_dict)
-
-# 3. next we need to create the central Jinja2 environment and we will load
-# the Jinja2 template file
-print("Create Jinja2 environment...")
-env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath="."))
-template = env.get_template(template_file)
-
-# we will make sure that the output directory exists
-if not os.path.exists(output_directory):
-    os.mkdir(output_directory)
-
-# 4. now create the templates
-print("Create templates...")
-for parameter in config_parameters:
-    result = template.render(parameter)
-    f = open(os.path.join(output_directory, parameter['hostname'] + ".config"), "w")
-    f.write(result)
-    f.close()
-    print("Configuration '%s' created..." % (parameter['hostname'] + ".config"))
-print("DONE")
+# columns that must be set in every row and the conversion of the column values (a row with an invalid value stops
+# the script)
+required_columns = ["hostname"]
+column_types = {
+    "management_ip": IPv4Address
+}
+
+# number of worker processes that render the configurations (defaults to the number of CPU cores)
+worker_count = None
+
+# the compiled templates are cached in the "_template_cache" directory (Jinja2 bytecode cache), if enabled the
+# templates are compiled to python modules instead
+use_precompiled_templates = False
+
+# only the configurations with a changed parameter record, template or custom filter are created again (the
+# fingerprints are stored within the output directory)
+incremental_generation = True
+
+
+if __name__ == "__main__":
+    # 1. read the contents from the CSV files, for Jinja2 every row is converted
+    # to a python dictionary (the column names are used as variables). The rows
+    # are read while the configurations are created, therefore the rendering
+    # starts with the first row
+    print("Read CSV parameter file...")
+    config_parameters = read_csv_parameters(csv_parameter_file,
+                                            delimiter=";",
+                                            column_types=column_types,
+                                            required_columns=required_columns)
+
+    # 2. next we need to create the renderer for the Jinja2 template file, the
+    # compiled template is loaded from the cache if the template is not changed
+    print("Create Jinja2 environment...")
+    renderer = ConfigRenderer(template_file,
+                              output_directory,
+                              output_file_pattern="%(hostname)s.config",
+                              filters=FILTERS,
+                              precompile=use_precompiled_templates)
+
+    # 3. now create the templates (the output directory is created if required)
+    print("Create templates...")
+    manifest = RenderManifest(renderer) if incremental_generation else None
+    try:
+        for output_file in render_configs(renderer, config_parameters, max_workers=worker_count, manifest=manifest):
+            print("Configuration '%s' created..." % os.path.basename(output_file))
+
+    except ParameterValidationError as ex:
+        print("Invalid CSV parameter file (%s), terminate script" % ex)
+        sys.exit(1)
+
+    if manifest is not None:
+        print("%d configurations unchanged..." % manifest.skipped)
+    print("DONE")
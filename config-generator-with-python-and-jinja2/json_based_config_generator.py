@@ -1,34 +1,50 @@
-import jinja2
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.config_rendering import ConfigRenderer, RenderManifest, render_configs
+from nethelpers.jinja_filters import FILTERS
 
 template_file = "switch_with_vlans.j2"
 json_parameter_file = "parameters.json"
 output_directory = "_output"
 
-# read the contents from the JSON files
-print("Read JSON parameter file...")
-config_parameters = json.load(open(json_parameter_file))
-
-# next we need to create the central Jinja2 environment and we will load
-# the Jinja2 template file (the two parameters ensure a clean output in the
-# configuration file)
-print("Create Jinja2 environment...")
-env = jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath="."),
-                         trim_blocks=True,
-                         lstrip_blocks=True)
-template = env.get_template(template_file)
-
-# we will make sure that the output directory exists
-if not os.path.exists(output_directory):
-    os.mkdir(output_directory)
-
-# now create the templates
-print("Create templates...")
-for parameter in config_parameters:
-    result = template.render(parameter)
-    f = open(os.path.join(output_directory, parameter['hostname'] + "_with_vlans.config"), "w")
-    f.write(result)
-    f.close()
-    print("Configuration '%s' created..." % (parameter['hostname'] + "_with_vlans.config"))
-print("DONE")
+# number of worker processes that render the configurations (defaults to the number of CPU cores)
+worker_count = None
+
+# the compiled templates are cached in the "_template_cache" directory (Jinja2 bytecode cache), if enabled the
+# templates are compiled to python modules instead
+use_precompiled_templates = False
+
+# only the configurations with a changed parameter record, template or custom filter are created again (the
+# fingerprints are stored within the output directory)
+incremental_generation = True
+
+if __name__ == "__main__":
+    # read the contents from the JSON files
+    print("Read JSON parameter file...")
+    with open(json_parameter_file) as f:
+        config_parameters = json.load(f)
+
+    # next we need to create the renderer for the Jinja2 template file (the
+    # two parameters ensure a clean output in the configuration file), the
+    # compiled template is loaded from the cache if the template is not changed
+    print("Create Jinja2 environment...")
+    renderer = ConfigRenderer(template_file,
+                              output_directory,
+                              output_file_pattern="%(hostname)s_with_vlans.config",
+                              filters=FILTERS,
+                              precompile=use_precompiled_templates,
+                              trim_blocks=True,
+                              lstrip_blocks=True)
+
+    # now create the templates (the output directory is created if required)
+    print("Create templates...")
+    manifest = RenderManifest(renderer) if incremental_generation else None
+    for output_file in render_configs(renderer, config_parameters, max_workers=worker_count, manifest=manifest):
+        print("Configuration '%s' created..." % os.path.basename(output_file))
+
+    if manifest is not None:
+        print("%d configurations unchanged..." % manifest.skipped)
+    print("DONE")
@@ -1,9 +1,12 @@
 import os
 import sys
-from ipaddress import IPv4Network, IPv4Interface, IPv4Address
 from ciscoconfparse import CiscoConfParse
 from ciscoconfparse.ccp_util import IPv4Obj
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.address_planning import allocate_hsrp_addresses, to_ipv4_interface
+from nethelpers.config_cache import load_cisco_config
+
 
 output_directory = "_output"
 input_configuration_file = "cisco_ios_vlans.txt"
@@ -19,7 +22,8 @@ if __name__ == "__main__":
     # load the input Cisco IOS configuration file
     print("load Cisco IOS configuration file...")
     try:
-        parsed_config = CiscoConfParse(input_configuration_file)
+        # the parsed configuration is cached, an unchanged configuration is not parsed again
+        parsed_config = load_cisco_config(input_configuration_file)
 
     except Exception as ex:
         print(ex)
@@ -50,18 +54,10 @@ if __name__ == "__main__":
         vlan_id = vlan_interface_string.lstrip("Vlan")
 
         # the current SVI address is used as a HSRP virtual IP
-        virtual_ip = ipv4_addr.ip_object
-
         # at this point we need to determine the next addresses which are used for the primary and secondary switch
         # we will try, if the next two addresses are part of the network, otherwise we will use the previous two
         # addresses
-        ipv4_network = IPv4Network(ipv4_addr.network)
-        if (ipv4_addr.ip_object + 1) in ipv4_network.hosts():
-            primary_ip = ipv4_addr.ip_object + 1
-            secondary_ip = ipv4_addr.ip_object + 2
-        else:
-            primary_ip = ipv4_addr.ip_object - 1
-            secondary_ip = ipv4_addr.ip_object - 2
+        virtual_ip, primary_ip, secondary_ip = allocate_hsrp_addresses("%s/%s" % (ipv4_addr.ip, ipv4_addr.netmask))
 
         # check for secondary IPv4 addresses
         add_ip_addresses = []
@@ -69,31 +65,22 @@ if __name__ == "__main__":
         for sec_ipv4_cmd in secondary_ipv4_address_lines:
             # another way to convert the ip address command
             sec_ipv4_addr = sec_ipv4_cmd.text[len(" ip address "):]
-            sec_ipv4_addr = sec_ipv4_addr.rstrip(" secondary")
-            sec_ipv4_addr = sec_ipv4_addr.replace(" ", "/")
-
-            # convert it to an IPv4Interface object from the ipaddresss module
-            ip_address = IPv4Interface(sec_ipv4_addr)
+            sec_ipv4_addr = sec_ipv4_addr[:-len(" secondary")]
 
-            # store it for later processing
-            add_ip_addresses.append(ip_address)
+            # convert it to an IPv4Interface object from the ipaddresss module and allocate the HSRP addresses
+            add_ip_addresses.append(allocate_hsrp_addresses(sec_ipv4_addr) + (to_ipv4_interface(sec_ipv4_addr),))
 
         # now add the configuration to the change scripts
         primary_config.append_line("interface %s" % vlan_interface_string)
         primary_config.append_line(" description *** VLAN SVI %s" % vlan_id)
         primary_config.append_line(" ip address %s %s" % (primary_ip, ipv4_addr.netmask))
-        for ipv4_address in add_ip_addresses:
-            # determine primary IP address
-            if IPv4Address(ipv4_address.ip + 1) in ipv4_address.network.hosts():
-                primary_ip = ipv4_address + 1
-            else:
-                primary_ip = ipv4_address - 1
-            primary_config.append_line(" ip address %s %s secondary" % (primary_ip.ip, ipv4_address.netmask))
+        for _, sec_primary_ip, _, ipv4_address in add_ip_addresses:
+            primary_config.append_line(" ip address %s %s secondary" % (sec_primary_ip, ipv4_address.netmask))
 
         primary_config.append_line(" standby version 2")
         primary_config.append_line(" standby 1 ip %s" % virtual_ip)
-        for ipv4_address in add_ip_addresses:
-            primary_config.append_line(" standby 1 ip %s secondary" % ipv4_address.ip)
+        for sec_virtual_ip, _, _, _ in add_ip_addresses:
+            primary_config.append_line(" standby 1 ip %s secondary" % sec_virtual_ip)
 
         primary_config.append_line(" standby 1 priority 255")
         primary_config.append_line(" standby 1 authentication md5 key-string vl%s" % vlan_id)
@@ -102,18 +89,13 @@ if __name__ == "__main__":
         secondary_config.append_line("interface %s" % vlan_interface_string)
         secondary_config.append_line(" description *** VLAN SVI %s" % vlan_id)
         secondary_config.append_line(" ip address %s %s" % (secondary_ip, ipv4_addr.netmask))
-        for ipv4_address in add_ip_addresses:
-            # determine secondary IP address
-            if IPv4Address(ipv4_address.ip + 2) in ipv4_address.network.hosts():
-                secondary_ip = ipv4_address + 2
-            else:
-                secondary_ip = ipv4_address - 2
-            secondary_config.append_line(" ip address %s %s secondary" % (secondary_ip.ip, ipv4_address.netmask))
+        for _, _, sec_secondary_ip, ipv4_address in add_ip_addresses:
+            secondary_config.append_line(" ip address %s %s secondary" % (sec_secondary_ip, ipv4_address.netmask))
 
         secondary_config.append_line(" standby version 2")
         secondary_config.append_line(" standby 1 ip %s" % virtual_ip)
-        for ipv4_address in add_ip_addresses:
-            secondary_config.append_line(" standby 1 ip %s secondary" % ipv4_address.ip)
+        for sec_virtual_ip, _, _, _ in add_ip_addresses:
+            secondary_config.append_line(" standby 1 ip %s secondary" % sec_virtual_ip)
 
         secondary_config.append_line(" standby 1 priority 254")
         secondary_config.append_line(" standby 1 authentication md5 key-string vl%s" % vlan_id)
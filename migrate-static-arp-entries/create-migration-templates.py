@@ -1,9 +1,13 @@
 import sys
 import os
-from ipaddress import IPv4Address, IPv4Network
+from ipaddress import IPv4Address
 from ciscoconfparse import CiscoConfParse
 from ciscoconfparse.ccp_util import IPv4Obj
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.config_cache import load_cisco_config
+from nethelpers.prefix_index import PrefixIndex
+
 # existing configuration file and output dir
 existing_configuration = "cisco_static_arp_configuration.txt"
 output_dir = "_output"
@@ -44,7 +48,8 @@ if __name__ == "__main__":
 
     print("Load confguration file...")
     try:
-        parsed_config = CiscoConfParse(existing_configuration)
+        # the parsed configuration is cached, an unchanged configuration is not parsed again
+        parsed_config = load_cisco_config(existing_configuration)
 
     except Exception as ex:
         print("FAILED")
@@ -59,33 +64,29 @@ if __name__ == "__main__":
     # get the static ARP entries
     static_arp_entries = parsed_config.find_objects("^arp\s(\S+\s+\S+)")
 
-    for static_arp_entry in static_arp_entries:
-        arp_record = dict()
+    # the VLAN SVIs are indexed by their IP network, the longest-prefix match is used to assign the ARP entries
+    svi_index = PrefixIndex()
+    for vlan_svi in vlan_svis:
+        svi_index.add(vlan_svi['ipv4_addr'] + "/" + vlan_svi['ipv4_netmask'], vlan_svi)
 
+    for static_arp_entry in static_arp_entries:
         # split the arp command and get the required infos
         # result looks like: ['arp', '10.0.100.115', '0100.5e7f.9271', 'ARPA']
         arr_obj = static_arp_entry.text.split()
         ipv4 = arr_obj[1]
         mac = arr_obj[2]
 
-        # now we create an IP address object from the ARP entry
-        arp_ipv4_addr = IPv4Address(ipv4)
-
-        # assign static arp entry to the VLAN SVI interface
-        for vlan_svi in vlan_svis:
-            svi_ipv4_network = IPv4Network(vlan_svi['ipv4_addr'] + "/" + vlan_svi['ipv4_netmask'], strict=False)
-            if arp_ipv4_addr in svi_ipv4_network.hosts():
-                # extend the model if the correct IP network is found
-                if "static_arps" not in vlan_svi.keys():
-                    vlan_svi['static_arps'] = list()
-                record = {
-                    'ipv4_host': ipv4,
-                    'mac': mac
-                }
-                vlan_svi['static_arps'].append(record)
-
-                # a static ARP is only defined on a single interface
-                break
+        # assign static arp entry to the VLAN SVI interface (a static ARP is only defined on a single interface)
+        vlan_svi = svi_index.lookup(IPv4Address(ipv4))
+        if vlan_svi is not None:
+            # extend the model if the correct IP network is found
+            if "static_arps" not in vlan_svi.keys():
+                vlan_svi['static_arps'] = list()
+            record = {
+                'ipv4_host': ipv4,
+                'mac': mac
+            }
+            vlan_svi['static_arps'].append(record)
 
     print("Write results to file...")
     cisco_nxos_template = CiscoConfParse(['!'])
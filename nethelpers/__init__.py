@@ -0,0 +1,6 @@
+"""
+common helper modules that are shared between the python script examples in this repository
+
+The scripts are executed from their own directory, therefore they add the root directory of the repository to the
+python path before importing from this package.
+"""
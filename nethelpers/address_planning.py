@@ -0,0 +1,97 @@
+"""
+IPv4 address planning helpers
+
+The host membership is tested with integer comparisons against the usable host range of the network, the host
+addresses are never enumerated (a "address in network.hosts()" test iterates up to 16M addresses on a /8).
+"""
+from ipaddress import IPv4Address, IPv4Interface
+
+
+def to_ipv4_interface(address):
+    """
+    convert the address to an IPv4Interface object
+
+    :param address: IPv4Interface object or string with the address and the netmask or prefix length (e.g.
+                    '10.1.1.1/24', '10.1.1.1/255.255.255.0' or '10.1.1.1 255.255.255.0')
+    :return: IPv4Interface object
+    """
+    if isinstance(address, IPv4Interface):
+        return address
+    return IPv4Interface(str(address).strip().replace(" ", "/"))
+
+
+def get_usable_host_range(network):
+    """
+    returns the first and the last usable host address of the network as integers (same addresses as
+    network.hosts(), /31 and /32 networks don't have a network and broadcast address)
+
+    :param network: IPv4Network object
+    :return: tuple with the first and the last usable host address
+    """
+    if network.prefixlen >= 31:
+        return int(network.network_address), int(network.broadcast_address)
+    return int(network.network_address) + 1, int(network.broadcast_address) - 1
+
+
+def is_usable_host(address, network):
+    """
+    returns True if the address is a usable host address of the network (same result as "address in
+    network.hosts()")
+
+    :param address: IPv4Address object or integer
+    :param network: IPv4Network object
+    """
+    first_host, last_host = get_usable_host_range(network)
+    return first_host <= int(address) <= last_host
+
+
+def next_usable_host(address, network, step=1):
+    """
+    returns the address `step` addresses after the given address if it is a usable host address of the network
+
+    :param address: IPv4Address object or integer
+    :param network: IPv4Network object
+    :param step: number of addresses
+    :return: IPv4Address object or None
+    """
+    candidate = int(address) + step
+    return IPv4Address(candidate) if is_usable_host(candidate, network) else None
+
+
+def previous_usable_host(address, network, step=1):
+    """
+    returns the address `step` addresses before the given address if it is a usable host address of the network
+
+    :param address: IPv4Address object or integer
+    :param network: IPv4Network object
+    :param step: number of addresses
+    :return: IPv4Address object or None
+    """
+    candidate = int(address) - step
+    return IPv4Address(candidate) if is_usable_host(candidate, network) else None
+
+
+def allocate_hsrp_addresses(interface):
+    """
+    allocate the addresses for a HSRP pair, the current address of the interface is used as the virtual IP. The
+    primary and secondary switch get the next two addresses, if they are not usable host addresses of the network, the
+    previous two addresses are used.
+
+    :param interface: IPv4Interface object or string (see to_ipv4_interface)
+    :return: tuple with the virtual IP, the primary IP and the secondary IP (IPv4Address objects)
+    :raises ValueError: if the network has not enough usable host addresses around the current address
+    """
+    interface = to_ipv4_interface(interface)
+    virtual_ip = interface.ip
+    network = interface.network
+
+    primary_ip = next_usable_host(virtual_ip, network, 1)
+    secondary_ip = next_usable_host(virtual_ip, network, 2)
+    if primary_ip is None or secondary_ip is None:
+        primary_ip = previous_usable_host(virtual_ip, network, 1)
+        secondary_ip = previous_usable_host(virtual_ip, network, 2)
+
+    if primary_ip is None or secondary_ip is None:
+        raise ValueError("no addresses for the HSRP pair available around %s in %s" % (virtual_ip, network))
+
+    return virtual_ip, primary_ip, secondary_ip
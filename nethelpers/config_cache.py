@@ -0,0 +1,197 @@
+"""
+on-disk cache for parsed Cisco IOS configurations (CiscoConfParse objects)
+
+The parsed configuration is stored as a pickle file that is named after the SHA-256 hash of the configuration content
+(including the ciscoconfparse version and the parser options). Repeated runs against the same configuration load the
+parsed structure from the cache and skip the parse step, a changed configuration gets a new hash and is parsed again.
+The cache files of old configurations are removed (least recently used first) if the cache directory exceeds the
+maximum size. The cache should not be used if every configuration is parsed only once (e.g. a batch run over the
+nightly backups).
+
+The objects are pickled with their attributes only, therefore no __setstate__ lookup is required on the (many) line
+objects during the load (some ciscoconfparse versions log every unknown attribute, which is very slow).
+
+The cache files must only be written by this module, never load cache files from an untrusted source.
+"""
+import gc
+import hashlib
+import os
+import pickle
+import ciscoconfparse
+from ciscoconfparse import CiscoConfParse
+
+# default directory for the cache files (relative to the current working directory)
+DEFAULT_CACHE_DIRECTORY = "_cache"
+
+# default maximum size of all cache files in bytes
+DEFAULT_MAX_CACHE_SIZE = 256 * 1024 * 1024
+
+CACHE_FILE_EXTENSION = ".pickle"
+
+# changed if the format of the cache files changes
+CACHE_FORMAT_VERSION = 1
+
+
+def _new_object(cls):
+    if issubclass(cls, list):
+        return list.__new__(cls)
+    if issubclass(cls, dict):
+        return dict.__new__(cls)
+    return object.__new__(cls)
+
+
+def _set_object_state(obj, state):
+    attributes, items = state
+    if isinstance(obj, list):
+        list.extend(obj, items)
+    elif isinstance(obj, dict):
+        dict.update(obj, items)
+    object.__getattribute__(obj, "__dict__").update(attributes)
+
+
+class _ConfigPickler(pickle.Pickler):
+    """
+    pickles the ciscoconfparse objects using their attributes (and the items of list or dict based objects)
+    """
+
+    def reducer_override(self, obj):
+        cls = type(obj)
+        if not cls.__module__.startswith("ciscoconfparse"):
+            return NotImplemented
+
+        try:
+            attributes = object.__getattribute__(obj, "__dict__")
+
+        except AttributeError:
+            return NotImplemented
+
+        items = None
+        if isinstance(obj, list):
+            items = list(list.__iter__(obj))
+        elif isinstance(obj, dict):
+            items = dict(dict.items(obj))
+
+        return _new_object, (cls,), (attributes, items), None, None, _set_object_state
+
+
+def get_config_hash(file_name, parser_options=None, block_size=1024 * 1024):
+    """
+    returns the SHA-256 hash of the configuration content, the ciscoconfparse version and the parser options
+
+    :param file_name: the configuration file
+    :param parser_options: dictionary with the keyword arguments for CiscoConfParse
+    :param block_size: number of bytes that are read at once
+    :return: the hash as hex string
+    """
+    content_hash = hashlib.sha256()
+    content_hash.update(("%d;%s;%r\n" % (CACHE_FORMAT_VERSION,
+                                         getattr(ciscoconfparse, "__version__", ""),
+                                         sorted((parser_options or {}).items()))).encode("utf-8"))
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            content_hash.update(block)
+
+    return content_hash.hexdigest()
+
+
+def _load_cache_file(cache_file):
+    # the garbage collector is disabled during the load, otherwise it runs many times while the objects are created
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _save_cache_file(cache_file, parsed_config):
+    temp_file = "%s.%d.tmp" % (cache_file, os.getpid())
+    try:
+        with open(temp_file, "wb") as f:
+            _ConfigPickler(f, pickle.HIGHEST_PROTOCOL).dump(parsed_config)
+        os.replace(temp_file, cache_file)
+
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def prune_cache(cache_directory=DEFAULT_CACHE_DIRECTORY, max_cache_size=DEFAULT_MAX_CACHE_SIZE):
+    """
+    remove the least recently used cache files until the total size of the cache files is below the maximum size
+
+    :param cache_directory: directory for the cache files
+    :param max_cache_size: maximum size of all cache files in bytes
+    :return: number of removed cache files
+    """
+    cache_files = []
+    total_size = 0
+    for entry in os.scandir(cache_directory):
+        if entry.is_file() and entry.name.endswith(CACHE_FILE_EXTENSION):
+            stat = entry.stat()
+            cache_files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+
+    removed = 0
+    for _, size, cache_file in sorted(cache_files):
+        if total_size <= max_cache_size:
+            break
+
+        try:
+            os.remove(cache_file)
+
+        except FileNotFoundError:
+            # already removed by another process
+            pass
+
+        total_size -= size
+        removed += 1
+
+    return removed
+
+
+def load_cisco_config(file_name, cache_directory=DEFAULT_CACHE_DIRECTORY, max_cache_size=DEFAULT_MAX_CACHE_SIZE,
+                      **parser_options):
+    """
+    returns the CiscoConfParse object for the configuration file, the parsed configuration is loaded from the cache if
+    the content of the file was already parsed
+
+    :param file_name: the configuration file
+    :param cache_directory: directory for the cache files, the cache is not used if None
+    :param max_cache_size: maximum size of all cache files in bytes, the least recently used cache files are removed
+                           if a new cache file exceeds the maximum size
+    :param parser_options: additional keyword arguments for CiscoConfParse
+    :return: CiscoConfParse object
+    """
+    if cache_directory is None:
+        return CiscoConfParse(file_name, **parser_options)
+
+    cache_file = os.path.join(cache_directory, get_config_hash(file_name, parser_options) + CACHE_FILE_EXTENSION)
+    if os.path.exists(cache_file):
+        try:
+            parsed_config = _load_cache_file(cache_file)
+
+            # the modification time is used to identify the least recently used cache files
+            os.utime(cache_file)
+            return parsed_config
+
+        except Exception as ex:
+            # parse the configuration again if the cache file is broken (e.g. created by another ciscoconfparse
+            # version)
+            print("--> cannot load cache file %s (%s), parse configuration again" % (cache_file, ex))
+
+    parsed_config = CiscoConfParse(file_name, **parser_options)
+
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        _save_cache_file(cache_file, parsed_config)
+        prune_cache(cache_directory, max_cache_size)
+
+    except Exception as ex:
+        # the cache is optional
+        print("--> cannot write cache file %s (%s)" % (cache_file, ex))
+
+    return parsed_config
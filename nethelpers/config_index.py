@@ -0,0 +1,177 @@
+"""
+single-pass parser for Cisco IOS style configurations
+
+The configuration is read line by line and converted to a list of sections (a top-level command with its child
+lines). The sections are indexed by the first word of the command (e.g. "interface" or "router") and by the interface
+name, therefore the queries don't need to scan the whole configuration again.
+"""
+import re
+from nethelpers.interface_names import expand_interface_name
+
+DESCRIPTION_REGEX = re.compile(r"^ description (?P<description>.*)$")
+IPV4_ADDRESS_REGEX = re.compile(r"^ ip address (?P<ipv4_address>\S+) (?P<subnet_mask>\S+)(?P<secondary> secondary)?$")
+
+
+class ConfigSection(object):
+    """
+    a top-level configuration command with all child lines (including nested child lines)
+    """
+    __slots__ = ["text", "children"]
+
+    def __init__(self, text):
+        self.text = text
+        self.children = []
+
+    @property
+    def keyword(self):
+        """
+        first word of the command (e.g. 'interface')
+        """
+        return self.text.split(" ", 1)[0]
+
+    @property
+    def arguments(self):
+        """
+        the command without the first word (e.g. the interface name)
+        """
+        parts = self.text.split(" ", 1)
+        return parts[1] if len(parts) > 1 else ""
+
+    def re_search_children(self, regex):
+        """
+        returns all child lines that match the regular expression
+
+        :param regex: compiled regular expression or string
+        :return: list of match objects
+        """
+        if not hasattr(regex, "search"):
+            regex = re.compile(regex)
+
+        results = []
+        for line in self.children:
+            match = regex.search(line)
+            if match:
+                results.append(match)
+        return results
+
+    def __repr__(self):
+        return "<ConfigSection %r (%d children)>" % (self.text, len(self.children))
+
+
+class ConfigIndex(object):
+    """
+    index of the configuration sections
+    """
+
+    def __init__(self, lines):
+        """
+        :param lines: iterable of configuration lines (e.g. an open file)
+        """
+        self.sections = []
+        self._sections_by_text = dict()
+        self._sections_by_keyword = dict()
+
+        current_section = None
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+
+            if line[0] in " \t":
+                # child line of the current section
+                if current_section is not None:
+                    current_section.children.append(line)
+
+            elif line[0] == "!":
+                current_section = None
+
+            else:
+                # a command is only added once, the child lines of a repeated command are merged (e.g. if the same
+                # interface is configured twice)
+                current_section = self._sections_by_text.get(line)
+                if current_section is None:
+                    current_section = ConfigSection(line)
+                    self.sections.append(current_section)
+                    self._sections_by_text[line] = current_section
+                    self._sections_by_keyword.setdefault(current_section.keyword, []).append(current_section)
+
+        self.interfaces = dict()
+        for section in self._sections_by_keyword.get("interface", []):
+            self.interfaces[section.arguments] = section
+
+    @classmethod
+    def from_file(cls, file_name):
+        """
+        create the index from a configuration file
+
+        :param file_name: the configuration file
+        """
+        with open(file_name) as f:
+            return cls(f)
+
+    def find_sections(self, regex, keyword=None):
+        """
+        returns all sections where the command matches the regular expression
+
+        :param regex: compiled regular expression or string
+        :param keyword: optional first word of the command, only the sections with this keyword are searched
+        :return: list of sections
+        """
+        if not hasattr(regex, "search"):
+            regex = re.compile(regex)
+
+        sections = self.sections if keyword is None else self._sections_by_keyword.get(keyword, [])
+        return [section for section in sections if regex.search(section.text)]
+
+    def has_section(self, regex, keyword=None):
+        """
+        returns True if a command matches the regular expression
+
+        :param regex: compiled regular expression or string
+        :param keyword: optional first word of the command, only the sections with this keyword are searched
+        """
+        return len(self.find_sections(regex, keyword)) > 0
+
+    def get_interface(self, interface_name, platform="ios"):
+        """
+        returns the section of the given interface, abbreviated interface names are accepted (e.g. 'Gi0/1')
+
+        :param interface_name: the interface name
+        :param platform: platform that is used to expand the interface name
+        :return: the section of the interface or None
+        """
+        section = self.interfaces.get(interface_name)
+        if section is None:
+            section = self.interfaces.get(expand_interface_name(interface_name, platform))
+        return section
+
+    def get_interface_descriptions(self):
+        """
+        returns the descriptions of the interfaces (only interfaces with a description)
+
+        :return: dictionary with the interface name and the description
+        """
+        result = dict()
+        for interface_name, section in self.interfaces.items():
+            for match in section.re_search_children(DESCRIPTION_REGEX):
+                result[interface_name] = match.group("description")
+        return result
+
+    def get_interface_ipv4_addresses(self, include_secondary=False):
+        """
+        returns the IPv4 addresses of the interfaces (only interfaces with an IPv4 address)
+
+        :param include_secondary: add the secondary IPv4 addresses to the result
+        :return: dictionary with the interface name and a list of (address, subnet mask, secondary) tuples
+        """
+        result = dict()
+        for interface_name, section in self.interfaces.items():
+            addresses = []
+            for match in section.re_search_children(IPV4_ADDRESS_REGEX):
+                is_secondary = match.group("secondary") is not None
+                if include_secondary or not is_secondary:
+                    addresses.append((match.group("ipv4_address"), match.group("subnet_mask"), is_secondary))
+
+            if addresses:
+                result[interface_name] = addresses
+        return result
@@ -0,0 +1,456 @@
+"""
+parallel rendering of Jinja2 configuration templates
+
+The parameter records are consumed from any iterable (e.g. a generator that reads the parameter file), therefore the
+rendering starts with the first record and the records are never loaded into memory at once. The records are sent in
+chunks to a process pool, every worker process compiles the template only once and writes the rendered
+configurations directly to the output directory. The number of chunks that are processed at the same time is limited,
+the memory usage does not depend on the number of records.
+
+The compiled templates are cached on disk, either as Jinja2 bytecode cache (default) or as python modules
+(precompiled templates). The bytecode cache compares the checksum of the template source, the precompiled templates
+are compiled again if a template within the searchpath changed. The environment options and the searchpath are part
+of the cache directory name, because they change the compiled code.
+"""
+import collections
+import concurrent.futures
+import hashlib
+import importlib.metadata
+import inspect
+import itertools
+import json
+import os
+import sys
+import tempfile
+import jinja2
+
+# size of the output buffer per configuration file in bytes
+OUTPUT_BUFFER_SIZE = 256 * 1024
+
+# number of parameter records that are sent to a worker process at once
+DEFAULT_CHUNKSIZE = 64
+
+# default directory for the compiled templates (relative to the current working directory)
+TEMPLATE_CACHE_DIRECTORY = "_template_cache"
+
+# file extensions of the templates that are precompiled
+TEMPLATE_EXTENSIONS = ["j2", "jinja2", "jinja"]
+
+# name of the file within the output directory that contains the fingerprints of the rendered configurations
+RENDER_MANIFEST_FILE = ".render_manifest.json"
+
+
+def _get_environment_fingerprint(searchpath, environment_options):
+    fingerprint = hashlib.sha1(("%s;%s;%r" % (jinja2.__version__,
+                                              os.path.abspath(searchpath),
+                                              sorted(environment_options.items()))).encode("utf-8"))
+    return fingerprint.hexdigest()[:16]
+
+
+def _get_package_versions(module):
+    # versions of the third-party packages that are imported within the module (e.g. python-slugify), the standard
+    # library is part of the python version
+    excluded_package_names = set(sys.stdlib_module_names) | set(sys.builtin_module_names)
+    excluded_package_names.add(module.__name__.split(".")[0])
+
+    package_names = set()
+    for value in vars(module).values():
+        if inspect.ismodule(value):
+            package_name = value.__name__.split(".")[0]
+        else:
+            package_name = (getattr(value, "__module__", None) or "").split(".")[0]
+
+        if package_name and package_name not in excluded_package_names:
+            package_names.add(package_name)
+
+    distributions = importlib.metadata.packages_distributions()
+    versions = []
+    for package_name in sorted(package_names):
+        for distribution in distributions.get(package_name, []):
+            try:
+                versions.append("%s==%s" % (distribution, importlib.metadata.version(distribution)))
+
+            except importlib.metadata.PackageNotFoundError:
+                pass
+
+        version = getattr(sys.modules.get(package_name), "__version__", None)
+        if version:
+            versions.append("%s:%s" % (package_name, version))
+
+    return versions
+
+
+def _get_module_fingerprint(module):
+    if module is None:
+        return ""
+
+    try:
+        module_source = inspect.getsource(module)
+
+    except (OSError, TypeError):
+        # e.g. built-in modules
+        module_source = repr(module)
+
+    return "%s\n%s\n%s" % (sys.version, module_source, ";".join(_get_package_versions(module)))
+
+
+def get_template_checksums(searchpath):
+    """
+    returns the SHA-256 checksum of all templates within the searchpath
+
+    :param searchpath: directory that contains the templates
+    :return: dictionary with the template name and the checksum
+    """
+    loader = jinja2.FileSystemLoader(searchpath=searchpath)
+    checksums = dict()
+    for template_name in loader.list_templates():
+        if template_name.rsplit(".", 1)[-1] in TEMPLATE_EXTENSIONS:
+            with open(os.path.join(searchpath, template_name), "rb") as f:
+                checksums[template_name] = hashlib.sha256(f.read()).hexdigest()
+    return checksums
+
+
+def precompile_templates(env, searchpath, target_directory):
+    """
+    compile the templates within the searchpath to python modules, the templates are only compiled again if a
+    template changed (the checksums are stored in the manifest.json file within the target directory)
+
+    :param env: the Jinja2 environment that is used to compile the templates
+    :param searchpath: directory that contains the templates
+    :param target_directory: directory for the compiled modules
+    :return: True if the templates were compiled
+    """
+    manifest_file = os.path.join(target_directory, "manifest.json")
+    checksums = get_template_checksums(searchpath)
+    try:
+        with open(manifest_file) as f:
+            if json.load(f) == checksums:
+                return False
+
+    except (OSError, ValueError):
+        pass
+
+    # the modules are compiled to a temporary directory and moved afterwards (other processes may use the target
+    # directory at the same time), the manifest is written last
+    if not os.path.exists(target_directory):
+        os.makedirs(target_directory)
+    # the prefix of the temporary directory never matches the name of a compiled module
+    temp_directory = tempfile.mkdtemp(prefix=".staging-", dir=target_directory)
+    try:
+        env.compile_templates(temp_directory, extensions=TEMPLATE_EXTENSIONS, zip=None, ignore_errors=False)
+        module_files = os.listdir(temp_directory)
+        for file_name in module_files:
+            os.replace(os.path.join(temp_directory, file_name), os.path.join(target_directory, file_name))
+
+        # remove the modules of deleted templates
+        for file_name in os.listdir(target_directory):
+            if not file_name.startswith("tmpl_") or not file_name.endswith(".py") or file_name in module_files:
+                continue
+
+            module_file = os.path.join(target_directory, file_name)
+            if os.path.isfile(module_file):
+                os.remove(module_file)
+
+        temp_manifest_file = os.path.join(temp_directory, "manifest.json")
+        with open(temp_manifest_file, "w") as f:
+            json.dump(checksums, f, indent=4)
+        os.replace(temp_manifest_file, manifest_file)
+
+    finally:
+        for file_name in os.listdir(temp_directory):
+            os.remove(os.path.join(temp_directory, file_name))
+        os.rmdir(temp_directory)
+
+    return True
+
+
+def create_environment(searchpath=".", filters=None, cache_directory=TEMPLATE_CACHE_DIRECTORY, precompile=False,
+                       **environment_options):
+    """
+    create a Jinja2 environment for the templates within the searchpath
+
+    :param searchpath: directory that contains the templates
+    :param filters: dictionary with custom filters
+    :param cache_directory: directory for the compiled templates, the templates are compiled on every start if None
+    :param precompile: compile the templates to python modules (within the cache directory) instead of using the
+                       bytecode cache
+    :param environment_options: additional keyword arguments for the Jinja2 environment (e.g. trim_blocks)
+    :return: Jinja2 environment
+    """
+    loader = jinja2.FileSystemLoader(searchpath=searchpath)
+    bytecode_cache = None
+    if cache_directory is not None:
+        fingerprint = _get_environment_fingerprint(searchpath, environment_options)
+        cache_directory = os.path.join(cache_directory, fingerprint)
+        if precompile:
+            compile_env = jinja2.Environment(loader=loader, **environment_options)
+            compile_env.filters.update(filters or dict())
+            module_directory = os.path.join(cache_directory, "modules")
+            precompile_templates(compile_env, searchpath, module_directory)
+            loader = jinja2.ChoiceLoader([jinja2.ModuleLoader(module_directory), loader])
+
+        else:
+            bytecode_directory = os.path.join(cache_directory, "bytecode")
+            if not os.path.exists(bytecode_directory):
+                os.makedirs(bytecode_directory, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_directory)
+
+    env = jinja2.Environment(loader=loader, bytecode_cache=bytecode_cache, **environment_options)
+    env.filters.update(filters or dict())
+    return env
+
+
+class ConfigRenderer(object):
+    """
+    renders a Jinja2 template to configuration files (one file per parameter record)
+
+    The Jinja2 environment and the template are created on the first use, therefore the renderer can be sent to the
+    worker processes (only the settings are pickled).
+    """
+
+    def __init__(self, template_file, output_directory, output_file_pattern="%(hostname)s.config", searchpath=".",
+                 filters=None, cache_directory=TEMPLATE_CACHE_DIRECTORY, precompile=False, **environment_options):
+        """
+        :param template_file: name of the Jinja2 template (relative to the searchpath)
+        :param output_directory: directory for the rendered configurations
+        :param output_file_pattern: name of the output file, formatted with the parameter record (e.g.
+                                    '%(hostname)s.config')
+        :param searchpath: directory that contains the templates
+        :param filters: dictionary with custom filters (must be module-level functions to use a process pool)
+        :param cache_directory: directory for the compiled templates, the templates are compiled on every start if None
+        :param precompile: compile the templates to python modules instead of using the bytecode cache
+        :param environment_options: additional keyword arguments for the Jinja2 environment (e.g. trim_blocks)
+        """
+        self.template_file = template_file
+        self.output_directory = output_directory
+        self.output_file_pattern = output_file_pattern
+        self.searchpath = searchpath
+        self.filters = filters or dict()
+        self.cache_directory = cache_directory
+        self.precompile = precompile
+        self.environment_options = environment_options
+        self._template = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_template"] = None
+        return state
+
+    def create_environment(self):
+        """
+        create the Jinja2 environment with the custom filters
+        """
+        return create_environment(self.searchpath,
+                                  filters=self.filters,
+                                  cache_directory=self.cache_directory,
+                                  precompile=self.precompile,
+                                  **self.environment_options)
+
+    def get_template(self):
+        """
+        returns the compiled template (compiled only once per process)
+        """
+        if self._template is None:
+            self._template = self.create_environment().get_template(self.template_file)
+        return self._template
+
+    def get_output_file(self, parameter):
+        """
+        returns the path of the output file for the parameter record
+        """
+        return os.path.join(self.output_directory, self.output_file_pattern % parameter)
+
+    def get_fingerprint(self):
+        """
+        returns a fingerprint of everything that changes the rendered configurations except the parameter records: the
+        templates within the searchpath (including the templates that are included or extended), the source code of
+        the modules that define the custom filters (including the versions of the third-party packages that are used
+        within these modules) and the environment options
+        """
+        fingerprint = hashlib.sha256()
+        fingerprint.update(("%s;%s;%s;%r\n" % (jinja2.__version__,
+                                               self.template_file,
+                                               self.output_file_pattern,
+                                               sorted(self.environment_options.items()))).encode("utf-8"))
+        fingerprint.update(json.dumps(get_template_checksums(self.searchpath), sort_keys=True).encode("utf-8"))
+
+        # the whole module of every filter is used, because the filters may use other functions or constants of the
+        # module
+        filter_modules = dict()
+        for filter_name in sorted(self.filters.keys()):
+            filter_function = self.filters[filter_name]
+            filter_module = inspect.getmodule(filter_function)
+            filter_module_name = filter_module.__name__ if filter_module else repr(filter_function)
+            filter_modules[filter_module_name] = filter_module
+            fingerprint.update(("%s;%s;%s\n" % (filter_name,
+                                                 filter_module_name,
+                                                 getattr(filter_function, "__qualname__", ""))).encode("utf-8"))
+
+        for filter_module_name in sorted(filter_modules.keys()):
+            module_fingerprint = _get_module_fingerprint(filter_modules[filter_module_name])
+            fingerprint.update(("%s\n%s\n" % (filter_module_name, module_fingerprint)).encode("utf-8"))
+
+        return fingerprint.hexdigest()
+
+    def render(self, parameter):
+        """
+        render the template with the parameter record and write the result to the output file
+
+        :param parameter: dictionary with the template variables
+        :return: path of the output file
+        """
+        output_file = self.get_output_file(parameter)
+        with open(output_file, "w", buffering=OUTPUT_BUFFER_SIZE) as f:
+            self.get_template().stream(parameter).dump(f)
+
+        return output_file
+
+
+class RenderManifest(object):
+    """
+    fingerprints of the rendered configurations, used to render only the configurations with changed inputs (the
+    parameter record, the templates or the custom filters)
+    """
+
+    def __init__(self, renderer, manifest_file=None):
+        """
+        :param renderer: ConfigRenderer instance
+        :param manifest_file: file with the fingerprints, defaults to RENDER_MANIFEST_FILE within the output directory
+        """
+        self.renderer = renderer
+        self.manifest_file = manifest_file or os.path.join(renderer.output_directory, RENDER_MANIFEST_FILE)
+        self.renderer_fingerprint = renderer.get_fingerprint()
+        self.fingerprints = dict()
+        self.skipped = 0
+        self._pending_fingerprints = dict()
+
+        try:
+            with open(self.manifest_file) as f:
+                self.fingerprints = json.load(f)
+
+        except (OSError, ValueError):
+            # render all configurations if the manifest doesn't exist or is broken
+            pass
+
+    def get_fingerprint(self, parameter):
+        """
+        returns the fingerprint of the configuration for the parameter record
+        """
+        fingerprint = hashlib.sha256(self.renderer_fingerprint.encode("utf-8"))
+        fingerprint.update(json.dumps(parameter, sort_keys=True, default=str).encode("utf-8"))
+        return fingerprint.hexdigest()
+
+    def filter_changed(self, parameters):
+        """
+        generator that returns only the parameter records with a changed fingerprint (or a missing output file)
+
+        :param parameters: iterable of parameter records
+        """
+        for parameter in parameters:
+            output_file = self.renderer.get_output_file(parameter)
+            key = os.path.basename(output_file)
+            fingerprint = self.get_fingerprint(parameter)
+            if self.fingerprints.get(key) == fingerprint and os.path.exists(output_file):
+                self.skipped += 1
+                continue
+
+            self._pending_fingerprints[key] = fingerprint
+            yield parameter
+
+    def add_rendered(self, output_file):
+        """
+        store the fingerprint of a rendered configuration
+        """
+        key = os.path.basename(output_file)
+        fingerprint = self._pending_fingerprints.pop(key, None)
+        if fingerprint is not None:
+            self.fingerprints[key] = fingerprint
+
+    def save(self):
+        """
+        write the fingerprints to the manifest file
+        """
+        temp_file = self.manifest_file + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump(self.fingerprints, f, indent=0, sort_keys=True)
+        os.replace(temp_file, self.manifest_file)
+
+
+_worker_renderer = None
+
+
+def _init_worker(renderer):
+    global _worker_renderer
+    _worker_renderer = renderer
+
+
+def _render_chunk(parameters):
+    return [_worker_renderer.render(parameter) for parameter in parameters]
+
+
+def render_configs(renderer, parameters, max_workers=None, chunksize=DEFAULT_CHUNKSIZE, max_pending_chunks=None,
+                   manifest=None):
+    """
+    render the configurations for all parameter records using a process pool
+
+    :param renderer: ConfigRenderer instance
+    :param parameters: iterable of parameter records (dictionaries)
+    :param max_workers: number of worker processes, defaults to the number of CPU cores (1 renders the configurations
+                        in the current process)
+    :param chunksize: number of parameter records that are sent to a worker process at once
+    :param max_pending_chunks: maximum number of chunks that are processed or wait for a worker process at the same
+                               time, defaults to twice the number of worker processes
+    :param manifest: RenderManifest instance, only the configurations with changed inputs are rendered (the number
+                     of unchanged configurations is counted in manifest.skipped)
+    :return: generator with the paths of the rendered output files (in the order of the parameter records)
+    """
+    if not os.path.exists(renderer.output_directory):
+        os.makedirs(renderer.output_directory)
+
+    if manifest is None:
+        for output_file in _render_configs(renderer, parameters, max_workers, chunksize, max_pending_chunks):
+            yield output_file
+        return
+
+    # the manifest is also written if the rendering fails, the configurations that are already rendered are not
+    # rendered again
+    try:
+        for output_file in _render_configs(renderer, manifest.filter_changed(parameters), max_workers, chunksize,
+                                           max_pending_chunks):
+            manifest.add_rendered(output_file)
+            yield output_file
+
+    finally:
+        manifest.save()
+
+
+def _render_configs(renderer, parameters, max_workers, chunksize, max_pending_chunks):
+    # the template is compiled (or loaded from the cache) before the worker processes are started, therefore the
+    # worker processes use the compiled template from the cache
+    renderer.get_template()
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for parameter in parameters:
+            yield renderer.render(parameter)
+        return
+
+    max_pending_chunks = max_pending_chunks or max_workers * 2
+    parameters = iter(parameters)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                initializer=_init_worker,
+                                                initargs=(renderer,)) as executor:
+        pending_chunks = collections.deque()
+        while True:
+            # read the next records only if a chunk was completed
+            while len(pending_chunks) < max_pending_chunks:
+                chunk = list(itertools.islice(parameters, chunksize))
+                if not chunk:
+                    break
+                pending_chunks.append(executor.submit(_render_chunk, chunk))
+
+            if not pending_chunks:
+                break
+
+            for output_file in pending_chunks.popleft().result():
+                yield output_file
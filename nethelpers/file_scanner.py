@@ -0,0 +1,50 @@
+"""
+lazy scan of directory trees (e.g. the input logs or configuration backups of the batch scripts)
+
+The files are yielded while the directories are scanned (os.scandir), therefore the processing of the first files can
+start before the whole tree is known. Symbolic links to directories are not followed (same behavior as os.walk).
+"""
+import os
+
+
+def get_files_in_path(root_dir, only_ext=None, skip_hidden=False):
+    """
+    returns a generator with all files from the given directory (including sub-directories), directories and files
+    that cannot be accessed are skipped
+
+    :param root_dir: the root directory
+    :param only_ext: optional file extension (e.g. "log" or ".log"), other files are skipped
+    :param skip_hidden: skip hidden files and directories (name starts with a dot)
+    :return: generator with the paths of the files
+    """
+    ends_with = None
+    if only_ext:
+        ends_with = only_ext if only_ext[0] == "." else "." + only_ext
+
+    directories = [root_dir]
+    while directories:
+        try:
+            entries = os.scandir(directories.pop())
+
+        except OSError:
+            # skip directories that are not accessible (same behavior as os.walk)
+            continue
+
+        with entries:
+            for entry in entries:
+                if skip_hidden and entry.name.startswith("."):
+                    continue
+
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                        continue
+
+                    is_file = entry.is_file()
+
+                except OSError:
+                    # skip entries that cannot be accessed
+                    continue
+
+                if is_file and (not ends_with or entry.name.endswith(ends_with)):
+                    yield entry.path
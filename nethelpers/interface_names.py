@@ -0,0 +1,202 @@
+"""
+normalization of interface names (e.g. 'GigabitEthernet1/0/1' to 'Gi1/0/1' and back)
+
+The interface types of every platform are stored in a prefix trie that is built once on import. The abbreviation uses
+the longest interface type that matches the beginning of the name, the expansion accepts every unique abbreviation of
+an interface type (like the Cisco CLI, e.g. 'Gi', 'Gig' and 'giga' are expanded to 'GigabitEthernet'). The results
+are cached, because the same interface names are normalized over and over again.
+
+Supported platforms:
+
+* ``ios`` - Cisco IOS/IOS-XE
+* ``nxos`` - Cisco NX-OS (includes the IOS interface types, e.g. for the ports of CDP neighbors)
+* ``junos`` - Juniper JunOS, the interface names (e.g. ge-0/0/0, xe-0/0/1, ae0) have no long form and are returned
+  unchanged
+"""
+import functools
+
+# interface types per platform (long name, short name)
+IOS_INTERFACE_TYPES = [
+    ("AppGigabitEthernet", "Ap"),
+    ("Ethernet", "Et"),
+    ("FastEthernet", "Fa"),
+    ("GigabitEthernet", "Gi"),
+    ("TwoGigabitEthernet", "Tw"),
+    ("FiveGigabitEthernet", "Fi"),
+    ("TenGigabitEthernet", "Te"),
+    ("TwentyFiveGigE", "Twe"),
+    ("FortyGigabitEthernet", "Fo"),
+    ("HundredGigE", "Hu"),
+    ("Loopback", "Lo"),
+    ("Port-channel", "Po"),
+    ("Serial", "Se"),
+    ("Tunnel", "Tu"),
+    ("Vlan", "Vl"),
+]
+
+NXOS_INTERFACE_TYPES = [
+    ("Ethernet", "Eth"),
+    ("port-channel", "Po"),
+    ("loopback", "Lo"),
+    ("Vlan", "Vlan"),
+    ("Tunnel", "Tunnel"),
+    ("mgmt", "mgmt"),
+    ("nve", "nve"),
+]
+
+PLATFORMS = ["ios", "nxos", "junos"]
+
+
+class _TrieNode(object):
+    __slots__ = ["children", "long_name", "completion"]
+
+    def __init__(self):
+        self.children = dict()
+        # long name of the interface type if the path to this node is a long or short interface type name
+        self.long_name = None
+        # long name of the only interface type below this node (None if there are multiple)
+        self.completion = None
+
+
+class InterfaceNameTrie(object):
+    """
+    prefix trie with the long and short names of the interface types of a platform (case-insensitive)
+    """
+
+    def __init__(self, interface_types):
+        """
+        :param interface_types: list of tuples with the long and the short name of an interface type
+        """
+        self.root = _TrieNode()
+        self.short_names = dict()
+
+        for long_name, short_name in interface_types:
+            self.short_names[long_name] = short_name
+            self._insert(long_name, long_name)
+
+        # the short names are inserted after the long names, an interface type has precedence over the short name of
+        # another interface type
+        for long_name, short_name in interface_types:
+            self._insert(short_name, long_name, overwrite=False)
+
+        self._compute_completions(self.root)
+
+    def _insert(self, key, long_name, overwrite=True):
+        node = self.root
+        for char in key.lower():
+            node = node.children.setdefault(char, _TrieNode())
+        if overwrite or node.long_name is None:
+            node.long_name = long_name
+
+    def _compute_completions(self, node):
+        """
+        determine the unique interface type below every node (bottom-up)
+        """
+        long_names = set()
+        if node.long_name:
+            long_names.add(node.long_name)
+        for child in node.children.values():
+            long_names.update(self._compute_completions(child))
+
+        node.completion = next(iter(long_names)) if len(long_names) == 1 else None
+        return long_names
+
+    def match_longest(self, name):
+        """
+        returns the longest interface type (long or short name) at the beginning of the given name, the interface
+        type must not be followed by a letter
+
+        :param name: the interface name
+        :return: tuple with the long name of the interface type and the length of the matched prefix (None and 0 if
+                 no interface type matches)
+        """
+        node = self.root
+        result = (None, 0)
+        for position, char in enumerate(name.lower()):
+            node = node.children.get(char)
+            if node is None:
+                break
+
+            if node.long_name and (position + 1 == len(name) or not name[position + 1].isalpha()):
+                result = (node.long_name, position + 1)
+
+        return result
+
+    def match_abbreviation(self, name):
+        """
+        returns the interface type for the abbreviation at the beginning of the given name (the letters and dashes
+        before the interface number)
+
+        :param name: the interface name
+        :return: tuple with the long name of the interface type and the length of the abbreviation (None and 0 if the
+                 abbreviation is unknown or ambiguous)
+        """
+        length = 0
+        while length < len(name) and (name[length].isalpha() or name[length] == "-"):
+            length += 1
+
+        node = self.root
+        for char in name[:length].lower():
+            node = node.children.get(char)
+            if node is None:
+                return None, 0
+
+        if length == 0:
+            return None, 0
+
+        return node.long_name or node.completion, length
+
+
+_TRIES = {
+    "ios": InterfaceNameTrie(IOS_INTERFACE_TYPES),
+    "nxos": InterfaceNameTrie(
+        [t for t in IOS_INTERFACE_TYPES if t[0].lower() not in [n[0].lower() for n in NXOS_INTERFACE_TYPES]] +
+        NXOS_INTERFACE_TYPES
+    ),
+}
+
+
+def _get_trie(platform):
+    if platform not in PLATFORMS:
+        raise ValueError("unknown platform '%s', valid platforms are: %s" % (platform, ", ".join(PLATFORMS)))
+    return _TRIES.get(platform)
+
+
+@functools.lru_cache(maxsize=4096)
+def abbreviate_interface_name(interface_name, platform="ios"):
+    """
+    returns the short form of the interface name (e.g. 'GigabitEthernet1/0/1' to 'Gi1/0/1'), unknown interface names
+    are returned unchanged
+
+    :param interface_name: the interface name
+    :param platform: the platform (ios, nxos or junos)
+    """
+    trie = _get_trie(platform)
+    if trie is None:
+        return interface_name
+
+    long_name, length = trie.match_longest(interface_name)
+    if long_name is None:
+        return interface_name
+
+    return trie.short_names[long_name] + interface_name[length:]
+
+
+@functools.lru_cache(maxsize=4096)
+def expand_interface_name(interface_name, platform="ios"):
+    """
+    returns the long form of the interface name (e.g. 'Gi1/0/1' or 'gig1/0/1' to 'GigabitEthernet1/0/1'), unknown
+    or ambiguous interface names are returned unchanged
+
+    :param interface_name: the interface name
+    :param platform: the platform (ios, nxos or junos)
+    """
+    trie = _get_trie(platform)
+    if trie is None:
+        return interface_name
+
+    long_name, length = trie.match_abbreviation(interface_name)
+    if long_name is None:
+        return interface_name
+
+    return long_name + interface_name[length:]
@@ -0,0 +1,75 @@
+"""
+custom filters for the Jinja2 configuration templates
+
+The filters are called for every interface within the template loops, therefore the results are cached: the netmasks
+of all prefix lengths are computed once on import and the slugs are cached using an LRU cache.
+
+usage:
+
+    env = jinja2.Environment(...)
+    register_filters(env)
+
+or with the ConfigRenderer:
+
+    renderer = ConfigRenderer(template_file, output_directory, filters=FILTERS)
+"""
+import functools
+from ipaddress import IPv4Network
+from slugify import slugify
+
+# netmask of every IPv4 prefix length (index 0 to 32)
+PREFIX_LENGTH_TO_NETMASK = [IPv4Network("0.0.0.0/%d" % prefix_length).netmask for prefix_length in range(33)]
+
+
+@functools.lru_cache(maxsize=1024)
+def _dotted_decimal_from_string(prefix_length):
+    try:
+        ip = IPv4Network("0.0.0.0/" + prefix_length)
+        return ip.netmask
+    except Exception:
+        return "[INVALID VALUE(" + prefix_length + ")]"
+
+
+def dotted_decimal(prefix_length):
+    """
+    converts the given prefix to a IPv4 dotted decimal representation
+
+    :param prefix_length: the prefix length (e.g. 24 or "24")
+    :return: the netmask or an "[INVALID VALUE(...)]" string
+    """
+    if type(prefix_length) is int:
+        if 0 <= prefix_length <= 32:
+            return PREFIX_LENGTH_TO_NETMASK[prefix_length]
+        return "[INVALID VALUE(" + str(prefix_length) + ")]"
+
+    # other values (e.g. strings) are converted like in the IPv4Network constructor
+    return _dotted_decimal_from_string(str(prefix_length))
+
+
+@functools.lru_cache(maxsize=65536)
+def slugify_string(text):
+    """
+    convert the given string to a slug
+
+    :param text: the text
+    :return: the slug
+    """
+    return slugify(text)
+
+
+# all filters with the name that is used within the templates
+FILTERS = {
+    "dotted_decimal": dotted_decimal,
+    "slugify_string": slugify_string,
+}
+
+
+def register_filters(env, filter_names=None):
+    """
+    register the custom filters on a Jinja2 environment
+
+    :param env: the Jinja2 environment
+    :param filter_names: list of the filters that should be registered, defaults to all filters
+    """
+    for filter_name in filter_names or FILTERS.keys():
+        env.filters[filter_name] = FILTERS[filter_name]
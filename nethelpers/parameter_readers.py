@@ -0,0 +1,69 @@
+"""
+streaming readers for parameter files (e.g. the input of the configuration generators)
+
+The records are read one after another, therefore the processing can start with the first record and the memory usage
+does not depend on the size of the file.
+"""
+import csv
+
+
+class ParameterValidationError(ValueError):
+    """
+    a record within the parameter file is not valid
+    """
+
+    def __init__(self, file_name, line_number, message):
+        self.file_name = file_name
+        self.line_number = line_number
+        ValueError.__init__(self, "%s, line %d: %s" % (file_name, line_number, message))
+
+
+def read_csv_parameters(file_name, delimiter=";", column_types=None, required_columns=None, encoding="utf-8"):
+    """
+    generator that reads the rows of a CSV file as dictionaries (the first row contains the column names), quoted
+    values are supported and empty rows are skipped
+
+    :param file_name: the CSV file
+    :param delimiter: delimiter between the columns
+    :param column_types: dictionary with the column name and a function that converts the value (e.g. int or
+                         ipaddress.IPv4Address), the function must raise a ValueError if the value is not valid
+    :param required_columns: list of columns that must exist and must not be empty in every row
+    :param encoding: encoding of the CSV file
+    :return: generator with a dictionary per row
+    :raises ParameterValidationError: if a row is not valid
+    """
+    column_types = column_types or dict()
+    required_columns = required_columns or []
+
+    with open(file_name, newline="", encoding=encoding) as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        header = reader.fieldnames or []
+
+        for column in list(required_columns) + list(column_types.keys()):
+            if column not in header:
+                raise ParameterValidationError(file_name, 1, "column '%s' not found" % column)
+
+        for row in reader:
+            if None in row:
+                raise ParameterValidationError(file_name, reader.line_num,
+                                               "too many values (%d columns expected)" % len(header))
+
+            for column in required_columns:
+                if not row[column]:
+                    raise ParameterValidationError(file_name, reader.line_num, "no value for column '%s'" % column)
+
+            for column, column_type in column_types.items():
+                value = row[column]
+                if value is None or value == "":
+                    # missing values are only verified for required columns
+                    row[column] = None
+                    continue
+
+                try:
+                    row[column] = column_type(value)
+
+                except ValueError as ex:
+                    raise ParameterValidationError(file_name, reader.line_num,
+                                                   "invalid value '%s' for column '%s' (%s)" % (value, column, ex))
+
+            yield row
@@ -0,0 +1,108 @@
+"""
+longest-prefix match of IPv4 addresses (e.g. to assign static ARP entries to the VLAN SVIs)
+
+The prefixes are converted to integer ranges that are flattened into sorted, non-overlapping segments. Every segment
+contains the prefixes that cover it (longest prefix first), therefore a lookup requires a single binary search
+(bisect) instead of a test against every prefix.
+"""
+import bisect
+from ipaddress import IPv4Address, IPv4Network
+from nethelpers.address_planning import get_usable_host_range
+
+
+def _to_int(address):
+    if isinstance(address, int):
+        return address
+    if not isinstance(address, IPv4Address):
+        address = IPv4Address(address)
+    return int(address)
+
+
+class PrefixIndex(object):
+    """
+    index of IPv4 prefixes for the longest-prefix match, the index is (re-)built on the first lookup after a prefix
+    was added
+    """
+
+    def __init__(self):
+        self._prefixes = []
+        self._segment_starts = []
+        self._segment_ends = []
+        self._segment_prefixes = []
+        self._is_built = True
+
+    def __len__(self):
+        return len(self._prefixes)
+
+    def add(self, network, value):
+        """
+        add a prefix to the index
+
+        :param network: IPv4Network object or string (e.g. '10.1.1.0/24', host bits are ignored)
+        :param value: the value that is returned by the lookup (e.g. the VLAN SVI record)
+        """
+        if not isinstance(network, IPv4Network):
+            network = IPv4Network(network, strict=False)
+
+        self._prefixes.append((int(network.network_address),
+                               int(network.broadcast_address),
+                               network.prefixlen,
+                               len(self._prefixes),
+                               get_usable_host_range(network),
+                               value))
+        self._is_built = False
+
+    def _build(self):
+        self._segment_starts = []
+        self._segment_ends = []
+        self._segment_prefixes = []
+
+        def add_segment(start, end):
+            if start <= end:
+                self._segment_starts.append(start)
+                self._segment_ends.append(end)
+                # longest prefix first, prefixes with the same length in the order they were added
+                self._segment_prefixes.append(sorted(open_prefixes, key=lambda p: (-p[2], p[3])))
+
+        # the prefixes are either nested or disjoint, a stack contains the prefixes that cover the current position
+        open_prefixes = []
+        position = 0
+        for prefix in sorted(self._prefixes, key=lambda p: (p[0], -p[1], p[3])):
+            while open_prefixes and open_prefixes[-1][1] < prefix[0]:
+                add_segment(position, open_prefixes[-1][1])
+                position = open_prefixes.pop()[1] + 1
+
+            if open_prefixes:
+                add_segment(position, prefix[0] - 1)
+
+            open_prefixes.append(prefix)
+            position = prefix[0]
+
+        while open_prefixes:
+            add_segment(position, open_prefixes[-1][1])
+            position = open_prefixes.pop()[1] + 1
+
+        self._is_built = True
+
+    def lookup(self, address, hosts_only=True):
+        """
+        returns the value of the longest prefix that contains the address
+
+        :param address: IPv4Address object, string or integer
+        :param hosts_only: the address must be a usable host address of the prefix (not the network or broadcast
+                           address), otherwise the next shorter prefix is used
+        :return: the value of the prefix or None if no prefix matches
+        """
+        if not self._is_built:
+            self._build()
+
+        address = _to_int(address)
+        position = bisect.bisect_right(self._segment_starts, address) - 1
+        if position < 0 or address > self._segment_ends[position]:
+            return None
+
+        for _, _, _, _, (first_host, last_host), value in self._segment_prefixes[position]:
+            if not hosts_only or first_host <= address <= last_host:
+                return value
+
+        return None
@@ -0,0 +1,129 @@
+"""
+streaming writers for tabular results (e.g. the rows returned by TextFSM)
+
+The rows are consumed from any iterable (lists or generators) and written through a large output buffer, therefore the
+number of write calls does not depend on the number of rows or cells. The output format is selected by the file
+extension:
+
+* ``.csv`` (default) - CSV file with a configurable delimiter
+* ``.jsonl`` - JSON Lines, one JSON object per row
+* ``.parquet`` - columnar Parquet file (requires the optional pyarrow module)
+"""
+import csv
+import itertools
+import json
+import os
+
+# size of the output buffer in bytes
+BUFFER_SIZE = 1024 * 1024
+
+# number of rows that are converted to a single columnar batch
+PARQUET_BATCH_SIZE = 65536
+
+
+def write_csv(file_name, header, rows, delimiter=";"):
+    """
+    write the rows to a CSV file
+
+    :param file_name: name of the output file
+    :param header: list of column names
+    :param rows: iterable of rows (lists with one value per column)
+    :param delimiter: delimiter between the columns
+    :return: number of rows written
+    """
+    counter = 0
+    with open(file_name, "w", newline="", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            counter += 1
+
+    return counter
+
+
+def write_json_lines(file_name, header, rows):
+    """
+    write the rows to a JSON Lines file, every row is converted to a JSON object with the column names as keys
+
+    :param file_name: name of the output file
+    :param header: list of column names
+    :param rows: iterable of rows (lists with one value per column)
+    :return: number of rows written
+    """
+    counter = 0
+    encoder = json.JSONEncoder()
+    with open(file_name, "w", encoding="utf-8", buffering=BUFFER_SIZE) as f:
+        for row in rows:
+            f.write(encoder.encode(dict(zip(header, row))) + "\n")
+            counter += 1
+
+    return counter
+
+
+def write_parquet(file_name, header, rows, batch_size=PARQUET_BATCH_SIZE):
+    """
+    write the rows to a columnar Parquet file, the rows are converted in batches to limit the memory usage
+
+    :param file_name: name of the output file
+    :param header: list of column names
+    :param rows: iterable of rows (lists with one value per column)
+    :param batch_size: number of rows per batch
+    :return: number of rows written
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+
+    except ImportError:
+        raise Exception("the pyarrow module is required to write Parquet files (pip install pyarrow)")
+
+    counter = 0
+    writer = None
+    rows = iter(rows)
+    try:
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+
+            # transpose the rows to columns
+            columns = [list(column) for column in zip(*batch)]
+            table = pyarrow.Table.from_arrays([pyarrow.array(column) for column in columns], names=header)
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(file_name, table.schema)
+            writer.write_table(table)
+            counter += len(batch)
+
+        if writer is None:
+            # no rows, write an empty file with the header
+            empty_table = pyarrow.Table.from_arrays([pyarrow.array([], type=pyarrow.string()) for _ in header],
+                                                    names=header)
+            pyarrow.parquet.write_table(empty_table, file_name)
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return counter
+
+
+def write_table(file_name, header, rows, delimiter=";"):
+    """
+    write the rows to the output file, the format is selected by the file extension
+
+    :param file_name: name of the output file
+    :param header: list of column names
+    :param rows: iterable of rows (lists with one value per column)
+    :param delimiter: delimiter between the columns (only used for CSV files)
+    :return: number of rows written
+    """
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension in [".jsonl", ".ndjson"]:
+        return write_json_lines(file_name, header, rows)
+
+    elif extension == ".parquet":
+        return write_parquet(file_name, header, rows)
+
+    else:
+        return write_csv(file_name, header, rows, delimiter=delimiter)
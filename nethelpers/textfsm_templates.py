@@ -0,0 +1,118 @@
+"""
+registry for compiled TextFSM templates
+
+Every template file is read and compiled only once and cached by its path and modification time (a changed template
+is compiled again). The registry hands out lightweight copies of the compiled template, because a TextFSM object keeps
+the state of the parser and must not be shared between two ParseText calls.
+"""
+import copy
+import os
+import threading
+
+try:
+    import textfsm
+except ImportError:
+    import jtextfsm as textfsm
+
+
+class TextFSMTemplateRegistry(object):
+    """
+    thread-safe cache of compiled TextFSM templates
+    """
+
+    def __init__(self):
+        self._templates = dict()
+        self._lock = threading.Lock()
+
+    def _get_compiled_template(self, template_file):
+        """
+        returns the cached TextFSM object for the given template file, the template is compiled if it is not cached
+        or if the file was modified
+
+        :param template_file: path to the TextFSM template
+        :return: compiled TextFSM object (must not be used for parsing)
+        """
+        template_path = os.path.abspath(template_file)
+        mtime = os.stat(template_path).st_mtime
+
+        with self._lock:
+            cached = self._templates.get(template_path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        with open(template_path) as f:
+            compiled_template = textfsm.TextFSM(f)
+
+        with self._lock:
+            self._templates[template_path] = (mtime, compiled_template)
+
+        return compiled_template
+
+    def get_template(self, template_file):
+        """
+        returns a TextFSM object for the given template file, that can be used for a single ParseText call
+
+        :param template_file: path to the TextFSM template
+        :return: TextFSM object
+        """
+        compiled_template = self._get_compiled_template(template_file)
+
+        # the states and rules are not modified while parsing and are shared with the cached template, only the
+        # values (which contain the current record) are copied
+        re_table = copy.copy(compiled_template)
+        re_table.values = []
+        for value in compiled_template.values:
+            value_copy = copy.copy(value)
+            value_copy.fsm = re_table
+            value_copy.options = []
+            for option in value.options:
+                option_copy = copy.copy(option)
+                option_copy.value = value_copy
+                value_copy.options.append(option_copy)
+            re_table.values.append(value_copy)
+
+        re_table.Reset()
+        return re_table
+
+    def parse_text(self, template_file, raw_text):
+        """
+        parse the given text using the template
+
+        :param template_file: path to the TextFSM template
+        :param raw_text: text that should be parsed
+        :return: tuple with the header and the parsed rows
+        """
+        re_table = self.get_template(template_file)
+        return re_table.header, re_table.ParseText(raw_text)
+
+    def clear(self):
+        """
+        remove all compiled templates from the cache
+        """
+        with self._lock:
+            self._templates.clear()
+
+
+# registry that is shared within the process
+default_registry = TextFSMTemplateRegistry()
+
+
+def get_template(template_file):
+    """
+    returns a TextFSM object for the given template file from the shared registry
+
+    :param template_file: path to the TextFSM template
+    :return: TextFSM object
+    """
+    return default_registry.get_template(template_file)
+
+
+def parse_text(template_file, raw_text):
+    """
+    parse the given text using the template from the shared registry
+
+    :param template_file: path to the TextFSM template
+    :param raw_text: text that should be parsed
+    :return: tuple with the header and the parsed rows
+    """
+    return default_registry.parse_text(template_file, raw_text)
@@ -1,34 +1,104 @@
-import jtextfsm as textfsm
-
-# Load the input file to a variable
-input_file = open("show_inventory.txt", encoding='utf-8')
-raw_text_data = input_file.read()
-input_file.close()
-
-# Run the text through the FSM. 
-# The argument 'template' is a file handle and 'raw_text_data' is a 
-# string with the content from the show_inventory.txt file
-template = open("show_inventory_multiple.textfsm")
-re_table = textfsm.TextFSM(template)
-fsm_results = re_table.ParseText(raw_text_data)
-
-# the results are written to a CSV file
-outfile_name = open("outfile.csv", "w+")
-outfile = outfile_name
-
-# Display result as CSV and write it to the output file
-# First the column headers...
-print(re_table.header)
-for s in re_table.header:
-    outfile.write("%s;" % s)
-outfile.write("\n")
-
-# ...now all row's which were parsed by TextFSM
-counter = 0
-for row in fsm_results:
-    print(row)
-    for s in row:
-        outfile.write("%s;" % s)
-    outfile.write("\n")
-    counter += 1
-print("Write %d records" % counter)
+"""
+parse the "show inventory" output from a Cisco IOS device using TextFSM and write the results to a CSV file
+
+If a directory is given as argument, all files within this directory are parsed in parallel using a process pool.
+The file name (without extension) is used as the source hostname, which is added as the first column to the results.
+Any other TextFSM template (e.g. for "show cdp neighbor detail") can be used in this mode.
+
+The output format depends on the extension of the output file: CSV (.csv), JSON Lines (.jsonl) or Parquet (.parquet).
+"""
+import concurrent.futures
+import os
+import sys
+
+# the compiled TextFSM templates are cached within a registry that is shared with the other scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.textfsm_templates import get_template
+from nethelpers.table_writers import write_table
+
+input_file_name = "show_inventory.txt"
+template_file_name = "show_inventory_multiple.textfsm"
+output_file_name = "outfile.csv"
+output_delimiter = ";"
+
+
+def parse_output_file(file_name, template_file=template_file_name):
+    """
+    parse a single CLI output file using TextFSM
+
+    :param file_name: file that contains the CLI output
+    :param template_file: TextFSM template that is used to parse the file
+    :return: tuple with the header and the parsed rows
+    """
+    # Load the input file to a variable
+    with open(file_name, encoding='utf-8') as input_file:
+        raw_text_data = input_file.read()
+
+    # Run the text through the FSM.
+    # The template is compiled only once per process by the registry, 'raw_text_data' is a
+    # string with the content from the input file
+    re_table = get_template(template_file)
+    fsm_results = re_table.ParseText(raw_text_data)
+    return re_table.header, fsm_results
+
+
+def parse_output_file_with_source(file_name, template_file=template_file_name):
+    """
+    parse a single CLI output file and add the source hostname (file name without extension) to every row
+
+    :param file_name: file that contains the CLI output
+    :param template_file: TextFSM template that is used to parse the file
+    :return: tuple with the header and the parsed rows
+    """
+    source_hostname = os.path.splitext(os.path.basename(file_name))[0]
+    header, fsm_results = parse_output_file(file_name, template_file)
+    return ["source_hostname"] + header, [[source_hostname] + row for row in fsm_results]
+
+
+def parse_output_directory(directory, template_file=template_file_name, max_workers=None):
+    """
+    parse all files within the given directory in parallel using a process pool, the results are merged into a
+    single table
+
+    :param directory: directory that contains the CLI outputs (one file per device)
+    :param template_file: TextFSM template that is used to parse the files
+    :param max_workers: number of worker processes, defaults to the number of CPU cores
+    :return: tuple with the header and a generator of the parsed rows of all files
+    """
+    header = ["source_hostname"] + get_template(template_file).header
+    return header, _iter_output_directory_rows(directory, template_file, max_workers)
+
+
+def _iter_output_directory_rows(directory, template_file, max_workers):
+    """
+    generator that yields the parsed rows of all files within the directory (in the order of the file names)
+    """
+    file_names = sorted(entry.path for entry in os.scandir(directory) if entry.is_file())
+    template_files = [os.path.abspath(template_file)] * len(file_names)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # send the files in chunks to the worker processes to reduce the IPC overhead
+        chunksize = max(1, len(file_names) // ((max_workers or os.cpu_count() or 1) * 4))
+        for _, fsm_results in executor.map(parse_output_file_with_source, file_names, template_files,
+                                           chunksize=chunksize):
+            for row in fsm_results:
+                yield row
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # batch mode: parse all files within the given directory
+        input_directory = sys.argv[1]
+        if len(sys.argv) > 2:
+            template_file_name = sys.argv[2]
+        if len(sys.argv) > 3:
+            output_file_name = sys.argv[3]
+
+        header, fsm_results = parse_output_directory(input_directory, template_file_name)
+
+    else:
+        header, fsm_results = parse_output_file(input_file_name, template_file_name)
+
+    # the results are streamed to the output file
+    counter = write_table(output_file_name, header, fsm_results, delimiter=output_delimiter)
+    print("Write %d records to %s" % (counter, output_file_name))
@@ -1,19 +1,15 @@
+import concurrent.futures
+import hashlib
+import itertools
+import json
 import os
 import re
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from nethelpers.file_scanner import get_files_in_path
 
-def get_files_in_path(root_dir, only_ext="log"):
-    """returns a list with all files from the given directory"""
-    files = [os.path.join(dirpath, file)
-             for (dirpath, dirnames, filenames) in os.walk(root_dir)
-             for file in filenames]
-
-    if only_ext:
-        ends_with = only_ext if only_ext[0] == "." else "." + only_ext
-        return [file for file in files if file.endswith(ends_with)]
-
-    else:
-        return files
+PROMPT_REGEX = re.compile(r"^\S+#")
 
 
 def split_config_file(raw_data):
@@ -42,29 +38,269 @@ def split_config_file(raw_data):
     return commands
 
 
+def split_config_file_to_directory(file_path, output_dir, known_hashes=None):
+    """
+    splits multiple outputs from a single file and writes every output directly to "<output_dir>/<command>.txt"
+
+    The file is read line by line and only the current line is kept in memory, therefore the memory usage does not
+    depend on the size of the file. The results are the same as with the split_config_file function.
+
+    If a dictionary with the known SHA256 hashes of the outputs (command: hash) is given, the outputs are written to a
+    temporary file first and an existing output file is only replaced if the content has changed. The dictionary is
+    updated with the hashes of the new outputs.
+
+    :param file_path: the file that contains the CLI commands and outputs
+    :param output_dir: the directory where the outputs are written to
+    :param known_hashes: optional dictionary with the hashes of the existing outputs
+    :return: list with the commands that were written (or verified)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written_commands = []
+    known_commands = set()
+
+    cmd = None
+    outfile = None
+    output_hash = None
+    held_line = None
+
+    def output_path(command, temporary=False):
+        return os.path.join(output_dir, (".%s.txt.tmp" if temporary else "%s.txt") % command.strip())
+
+    def write_line(line):
+        # the output file is created with the first output line (commands without output are skipped)
+        nonlocal outfile, output_hash
+        if outfile is None:
+            outfile = open(output_path(cmd, temporary=known_hashes is not None), "w")
+            output_hash = hashlib.sha256()
+            if cmd.strip() not in known_commands:
+                known_commands.add(cmd.strip())
+                written_commands.append(cmd.strip())
+
+        else:
+            line = "\n" + line
+
+        outfile.write(line)
+        if known_hashes is not None:
+            output_hash.update(line.encode("utf-8"))
+
+    def close_output():
+        nonlocal outfile
+        if outfile is None:
+            return
+
+        outfile.close()
+        outfile = None
+        if known_hashes is not None:
+            # replace the output file only if the content has changed
+            digest = output_hash.hexdigest()
+            if known_hashes.get(cmd.strip()) == digest and os.path.exists(output_path(cmd)):
+                os.remove(output_path(cmd, temporary=True))
+            else:
+                os.replace(output_path(cmd, temporary=True), output_path(cmd))
+            known_hashes[cmd.strip()] = digest
+
+    try:
+        with open(file_path) as f:
+            for line in f:
+                match = PROMPT_REGEX.match(line)
+                if match:
+                    # the line break before the prompt is not part of the output, therefore a trailing empty line of
+                    # the previous output is dropped
+                    if held_line:
+                        write_line(held_line)
+                    close_output()
+
+                    cmd = line[match.end():].rstrip("\n")
+                    held_line = None
+
+                elif cmd is not None:
+                    # ignore everything before the first prompt, the previous line is written with one line delay
+                    if held_line is not None:
+                        write_line(held_line)
+                    held_line = line.rstrip("\n")
+
+            if held_line is not None:
+                write_line(held_line)
+            close_output()
+
+    finally:
+        if outfile is not None:
+            outfile.close()
+
+    return written_commands
+
+
+def get_file_fingerprint(file_path, block_size=1024 * 1024):
+    """
+    returns the size, modification time and SHA256 hash of the given file
+
+    :param file_path: the file
+    :param block_size: number of bytes that are read at once
+    :return: dictionary with the size, mtime (in nanoseconds) and sha256 of the file
+    """
+    stat = os.stat(file_path)
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            file_hash.update(block)
+
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": file_hash.hexdigest()
+    }
+
+
+def load_manifest(manifest_file):
+    """
+    load the manifest of the last run, an empty manifest is returned if the file doesn't exist
+
+    :param manifest_file: the manifest file (JSON)
+    :return: dictionary with the file path and the fingerprint of the input file and its outputs
+    """
+    if not os.path.exists(manifest_file):
+        return dict()
+
+    with open(manifest_file) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest_file, manifest):
+    """
+    save the manifest (the file is replaced atomically)
+
+    :param manifest_file: the manifest file (JSON)
+    :param manifest: the manifest dictionary
+    """
+    with open(manifest_file + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_file + ".tmp", manifest_file)
+
+
+def split_host_log(file_path, output_directory):
+    """
+    splits a single host log, the results are written to "<output_directory>/<hostname>/<command>.txt"
+
+    :param file_path: the log file, the file name contains only the hostname following an extension
+    :param output_directory: the root directory for the results
+    :return: tuple with the hostname and the list of the commands that were written
+    """
+    hostname = os.path.basename(file_path)[:-len(".log")]
+    commands = split_config_file_to_directory(file_path, os.path.join(output_directory, hostname))
+    return hostname, commands
+
+
+def split_host_log_incremental(file_path, output_directory, manifest_entry=None):
+    """
+    splits a single host log, if the log has not changed since the last run (based on the manifest entry) it is
+    skipped and only changed outputs are written, outputs of commands that are no longer part of the log are removed
+
+    :param file_path: the log file, the file name contains only the hostname following an extension
+    :param output_directory: the root directory for the results
+    :param manifest_entry: the manifest entry of the log file from the last run (or None)
+    :return: tuple with the hostname, the list of the commands (None if skipped) and the new manifest entry
+    """
+    hostname = os.path.basename(file_path)[:-len(".log")]
+    host_directory = os.path.join(output_directory, hostname)
+
+    if manifest_entry and os.path.isdir(host_directory):
+        # size and modification time are checked first, the file is only hashed if one of them has changed
+        stat = os.stat(file_path)
+        if manifest_entry["size"] == stat.st_size and manifest_entry["mtime"] == stat.st_mtime_ns:
+            return hostname, None, manifest_entry
+
+    fingerprint = get_file_fingerprint(file_path)
+    if manifest_entry and os.path.isdir(host_directory) and manifest_entry["sha256"] == fingerprint["sha256"]:
+        fingerprint["outputs"] = manifest_entry.get("outputs", dict())
+        return hostname, None, fingerprint
+
+    known_hashes = dict(manifest_entry.get("outputs", dict())) if manifest_entry else dict()
+    commands = split_config_file_to_directory(file_path, host_directory, known_hashes=known_hashes)
+
+    # only the commands of the current log are part of the manifest, the outputs of commands that are no longer part
+    # of the log are removed (otherwise they would be treated as current outputs)
+    fingerprint["outputs"] = {command: known_hashes[command] for command in commands}
+    for command in sorted(set(known_hashes.keys()) - set(commands)):
+        stale_file = os.path.join(host_directory, "%s.txt" % command)
+        if os.path.exists(stale_file):
+            os.remove(stale_file)
+            print("%s: command '%s' not found in the log, output removed" % (hostname, command))
+
+    return hostname, commands, fingerprint
+
+
+def split_host_logs_in_parallel(file_paths, output_directory, max_workers=None, chunksize=16, manifest=None):
+    """
+    splits multiple host logs in parallel using a process pool
+
+    :param file_paths: iterable with the log files
+    :param output_directory: the root directory for the results
+    :param max_workers: number of worker processes, defaults to the number of CPU cores
+    :param chunksize: number of files that are sent to a worker process at once
+    :param manifest: optional manifest of the last run, unchanged logs are skipped and the manifest is updated
+    :return: dictionary with the hostname and the list of the commands that were written (None if skipped)
+    """
+    summary = dict()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        if manifest is None:
+            for hostname, commands in executor.map(split_host_log,
+                                                   file_paths,
+                                                   itertools.repeat(output_directory),
+                                                   chunksize=chunksize):
+                summary[hostname] = commands
+
+        else:
+            file_paths = list(file_paths)
+            results = executor.map(split_host_log_incremental,
+                                   file_paths,
+                                   itertools.repeat(output_directory),
+                                   [manifest.get(file_path) for file_path in file_paths],
+                                   chunksize=chunksize)
+            for file_path, (hostname, commands, manifest_entry) in zip(file_paths, results):
+                summary[hostname] = commands
+                manifest[file_path] = manifest_entry
+
+    return summary
+
+
 if __name__ == "__main__":
     INPUT_DIRECTORY = "_input"
     OUTPUT_DIRECTORY = "_output"
 
-    files = get_files_in_path(INPUT_DIRECTORY, only_ext="log")
+    # the manifest contains the fingerprints of the input files and outputs of the last run, unchanged logs are
+    # skipped (set to None to always split all logs)
+    MANIFEST_FILE = "_manifest.json"
 
-    for file_path in files:
-        if not os.path.isfile(file_path):
-            print("File not found or no file: %s -- skip it" % file_path)
+    # number of worker processes, the files are processed one after another if set to 1
+    WORKER_COUNT = os.cpu_count()
 
-        else:
-            with open(file_path) as f:
-                raw_data = f.read()
+    files = get_files_in_path(INPUT_DIRECTORY, only_ext="log")
+    manifest = load_manifest(MANIFEST_FILE) if MANIFEST_FILE else None
 
-            # the file name contains only the hostname following an extension
-            hostname = os.path.basename(file_path)[:-len(".log")]
+    if WORKER_COUNT == 1:
+        summary = dict()
+        for file_path in files:
+            if manifest is None:
+                hostname, commands = split_host_log(file_path, OUTPUT_DIRECTORY)
+            else:
+                hostname, commands, manifest[file_path] = split_host_log_incremental(file_path,
+                                                                                     OUTPUT_DIRECTORY,
+                                                                                     manifest.get(file_path))
+            summary[hostname] = commands
 
-            # split the file in a <command>: <content> dictionary
-            result = split_config_file(raw_data)
+    else:
+        summary = split_host_logs_in_parallel(files, OUTPUT_DIRECTORY, max_workers=WORKER_COUNT, manifest=manifest)
+
+    if manifest is not None:
+        save_manifest(MANIFEST_FILE, manifest)
 
-            # write results to the directory
-            root_dir = os.path.join(OUTPUT_DIRECTORY, hostname)
-            os.makedirs(root_dir, exist_ok=True)
-            for command in result:
-                with open(os.path.join(root_dir, "%s.txt" % command.strip()), "w+") as f:
-                    f.write(result[command])
+    for hostname in sorted(summary.keys()):
+        if summary[hostname] is None:
+            print("%s: unchanged, skipped" % hostname)
+        else:
+            print("%s: %d commands extracted" % (hostname, len(summary[hostname])))
+    print("%d commands extracted from %d host logs (%d unchanged host logs skipped)" % (
+        sum(len(c) for c in summary.values() if c is not None),
+        len([c for c in summary.values() if c is not None]),
+        len([c for c in summary.values() if c is None])
+    ))